@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""CPU 热路径微基准
+
+在 1k / 10k / 100k 条合成 Star 数据上测量：
+- Repository.from_github_api
+- Repository.to_dict（日期解析: _format_date / _calculate_inactive_days / _calculate_project_age）
+- DataProcessor.process_repositories（桩获取器，不发网络请求）
+- AIAnalyzer._build_context（筛选与排序，不调用 LLM）
+- CSVExporter.export
+
+记录耗时（多次取最小值）和峰值内存（tracemalloc），与 baseline.json 比较，
+任一指标超出容差即以非零状态退出。
+
+用法:
+    python benchmarks/run_benchmarks.py                    # 与基线比较
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 # 只跑部分规模
+    python benchmarks/run_benchmarks.py --update-baseline  # 重新生成基线
+"""
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd
+from config.settings import Settings
+from models.repository import Repository
+from processors.data_processor import DataProcessor
+from analyzers.ai_analyzer import AIAnalyzer
+from output.csv_exporter import CSVExporter
+from synthetic import make_dataset
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+class StubReadmeExtractor:
+    """不访问网络的 README 提取器"""
+
+    def extract(self, repo_full_name: str) -> str:
+        return self.summarize(self.fetch_text(repo_full_name))
+
+    def fetch_text(self, repo_full_name: str) -> str:
+        return f"{repo_full_name} 的合成描述"
+
+    def summarize(self, text: str) -> str:
+        return text[:50]
+
+    def summarize_many(self, readmes: Dict[str, str], fallbacks: Optional[Set[str]] = None) -> Dict[str, str]:
+        return {name: self.summarize(text) for name, text in readmes.items()}
+
+
+class StubStatsFetcher:
+    """不访问网络的统计获取器"""
+
+    def fetch_latest_commit(self, repo_full_name: str, branch: str = "main") -> str:
+        return "Update README.md"
+
+    def try_fetch_commit_activity(self, repo_full_name: str) -> int:
+        return 42
+
+
+def bench_settings() -> Settings:
+    """基准用配置：关闭缓存，避免读写磁盘状态"""
+    return Settings(
+        github_token="benchmark",
+        github_username="benchmark",
+        openai_api_key="benchmark",
+        enrichment_cache=False,
+        http_cache_max_mb=0,
+        report_memo=False,
+    )
+
+
+def build_cases(size: int, workdir: str) -> Dict[str, Callable[[], Any]]:
+    """准备输入数据，返回 {基准名: 被测函数}"""
+    settings = bench_settings()
+    raw = make_dataset(size)
+    repos = [Repository.from_github_api(item) for item in raw]
+    processor = DataProcessor(settings)
+    rows = processor.process_repositories(repos, StubReadmeExtractor(), StubStatsFetcher())
+    df = pd.DataFrame(rows)
+    analyzer = AIAnalyzer(settings)
+    exporter = CSVExporter(workdir)
+
+    return {
+        "from_github_api": lambda: [Repository.from_github_api(item) for item in raw],
+        "to_dict": lambda: [repo.to_dict() for repo in repos],
+        "process_repositories": lambda: processor.process_repositories(
+            repos, StubReadmeExtractor(), StubStatsFetcher()
+        ),
+        "analyze_context": lambda: analyzer._build_context(df),
+        "csv_export": lambda: exporter.export(rows, "bench"),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """测量耗时（取最小值）和峰值内存"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc 会拖慢执行，单独跑一次只测内存
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(min(timings), 5), "peak_mb": round(peak / 1024 / 1024, 3)}
+
+
+def run(sizes: List[int], only: List[str]) -> Dict[str, Dict[str, float]]:
+    """执行全部基准，返回 {"名称@规模": 指标}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            print(f"📦 准备 {size} 条合成数据...")
+            cases = build_cases(size, workdir)
+            repeat = 5 if size <= 1000 else 3 if size <= 10000 else 1
+            for name, func in cases.items():
+                if only and name not in only:
+                    continue
+                key = f"{name}@{size}"
+                results[key] = measure(func, repeat)
+                print(f"   {key:<32} {results[key]['seconds']:>9.4f}s {results[key]['peak_mb']:>9.2f} MB")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float, min_seconds: float, min_mb: float) -> List[str]:
+    """与基线比较，返回超出容差的指标说明"""
+    regressions = []
+    for key, metrics in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"   ⚠️ {key} 没有基线数据，跳过比较")
+            continue
+        for metric, floor in (("seconds", min_seconds), ("peak_mb", min_mb)):
+            old, new = base[metric], metrics[metric]
+            # 同时超过相对容差和绝对下限才算退化，避免小数值的抖动误报
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append(f"{key} {metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CPU 热路径微基准")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="逗号分隔的数据规模 (默认: 1000,10000,100000)")
+    parser.add_argument("--only", default="", help="逗号分隔的基准名，只运行这些基准")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果写入基线")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许的相对退化比例 (默认: 0.3)")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="耗时退化的绝对下限 (默认: 5ms)")
+    parser.add_argument("--min-mb", type=float, default=0.5, help="内存退化的绝对下限 (默认: 0.5MB)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = [s.strip() for s in args.only.split(",") if s.strip()]
+    results = run(sizes, only)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"✅ 基线已更新: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"❌ 找不到基线文件 {baseline_path}，请先运行 --update-baseline")
+        return 2
+
+    regressions = compare(results, json.loads(baseline_path.read_text()),
+                          args.tolerance, args.min_seconds, args.min_mb)
+    if regressions:
+        print("❌ 性能退化:")
+        for line in regressions:
+            print(f"   - {line}")
+        return 1
+    print("✅ 所有基准均在容差范围内")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
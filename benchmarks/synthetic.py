@@ -0,0 +1,41 @@
+"""合成的 GitHub Star 数据集"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+LANGUAGES = ["Python", "TypeScript", "Go", "Rust", "JavaScript", "C++", "Java", None]
+TOPICS = ["cli", "llm", "web", "database", "devtools", "machine-learning", "kubernetes", "security"]
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def make_repo(i: int, rng: random.Random, now: datetime) -> Dict[str, Any]:
+    """生成一条与 GitHub API 返回结构一致的仓库记录"""
+    created = now - timedelta(days=rng.randint(30, 4000))
+    pushed = now - timedelta(days=rng.randint(0, 1500), seconds=rng.randint(0, 86399))
+    stars = int(rng.paretovariate(1.2) * 10)
+    return {
+        "full_name": f"owner{i % 997}/repo-{i}",
+        "description": None if rng.random() < 0.1 else f"Synthetic project number {i}",
+        "html_url": f"https://github.com/owner{i % 997}/repo-{i}",
+        "language": rng.choice(LANGUAGES),
+        "stargazers_count": stars,
+        "pushed_at": pushed.strftime(DATE_FORMAT),
+        "default_branch": "main",
+        "updated_at": pushed.strftime(DATE_FORMAT),
+        "created_at": created.strftime(DATE_FORMAT),
+        "archived": rng.random() < 0.05,
+        "disabled": rng.random() < 0.005,
+        "watchers_count": stars,
+        "subscribers_count": stars // 20,
+        "forks_count": stars // 8,
+        "open_issues_count": rng.randint(0, 300),
+        "has_issues": rng.random() < 0.95,
+        "topics": rng.sample(TOPICS, rng.randint(0, 4)),
+    }
+
+
+def make_dataset(size: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """生成 size 条仓库记录，相同的 seed 得到相同的数据"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    return [make_repo(i, rng, now) for i in range(size)]
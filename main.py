@@ -14,13 +14,71 @@ from config.settings import Settings
 from fetchers.starred_repos import StarredRepoFetcher
 from fetchers.readme_extractor import ReadmeExtractor
 from fetchers.repo_stats import RepoStatsFetcher
+from fetchers.graphql_enricher import GraphQLEnricher
 from processors.data_processor import DataProcessor
+from processors.batch_processor import BatchProcessor
 from analyzers.ai_analyzer import AIAnalyzer
 from output.csv_exporter import CSVExporter
 from output.markdown_exporter import MarkdownExporter
+from storage.snapshot_store import SnapshotStore
 from datetime import datetime
 
 
+def chunked(items, size):
+    """把列表按固定大小切块"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def run_batch(settings, data_processor, readme_extractor, stats_fetcher, graphql_enricher,
+              ai_analyzer, csv_exporter, markdown_exporter, snapshot_store):
+    """团队批量模式：共享丰富化结果，为每个用户分别输出"""
+    import pandas as pd
+
+    batch_processor = BatchProcessor(settings, data_processor)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    start_time = time.time()
+
+    print("\n📡 [步骤 1/4] 正在获取团队成员的 Starred 仓库列表...")
+    users = batch_processor.resolve_users()
+    if not users:
+        print("❌ 未找到任何用户，程序退出")
+        return
+    star_lists = batch_processor.fetch_star_lists(users)
+
+    print(f"\n⚙️ [步骤 2/4] 正在对去重后的仓库进行深入分析...")
+    rows_by_user = batch_processor.process(
+        star_lists, readme_extractor, stats_fetcher, graphql_enricher
+    )
+    print(f"   ✓ 仓库分析完成! 总用时 {time.time() - start_time:.1f}s")
+
+    print(f"\n💾 [步骤 3/4] 正在为 {len(users)} 名用户分别保存 CSV 文件...")
+    run_at = datetime.strptime(timestamp, '%Y%m%d_%H%M%S').strftime('%Y-%m-%dT%H:%M:%S')
+    for username, rows in rows_by_user.items():
+        csv_filename = csv_exporter.export(rows, timestamp, username)
+        if snapshot_store is not None:
+            snapshot_store.append_rows(snapshot_store.start_run(run_at, username), rows)
+        print(f"   ✓ {username}: {len(rows)} 个仓库 -> {csv_filename}")
+
+    print(f"\n🧠 [步骤 4/4] 正在通过 LLM 为每名用户生成分析报告...")
+    for username, rows in rows_by_user.items():
+        if not rows:
+            continue
+        if settings.report_stream:
+            with markdown_exporter.open_stream(timestamp, username) as writer:
+                for chunk in ai_analyzer.stream(pd.DataFrame(rows), username):
+                    writer.write(chunk)
+            md_filename = writer.filename
+        else:
+            report = ai_analyzer.analyze(pd.DataFrame(rows), username)
+            md_filename = markdown_exporter.export(report, timestamp, username)
+        print(f"   ✓ {username}: {md_filename}")
+
+    print("\n" + "="*50)
+    print("✅ 所有任务完成!")
+    print("="*50)
+
+
 def main():
     """主程序"""
     try:
@@ -34,41 +92,64 @@ def main():
         repo_fetcher = StarredRepoFetcher(settings)
         readme_extractor = ReadmeExtractor(settings)
         stats_fetcher = RepoStatsFetcher(settings)
+        graphql_enricher = GraphQLEnricher(settings) if settings.enrichment_backend == "graphql" else None
         data_processor = DataProcessor(settings)
         ai_analyzer = AIAnalyzer(settings)
         csv_exporter = CSVExporter()
         markdown_exporter = MarkdownExporter()
+        snapshot_store = SnapshotStore(settings.history_db) if settings.history_db else None
 
         # 3. 执行数据流
         print("\n" + "="*50)
         print("🚀 GitHub Star Tracker 开始运行")
         print("="*50)
 
-        # 3.1 获取数据
-        print("\n📡 [步骤 1/4] 正在获取 GitHub Starred 仓库列表...")
-        start_time = time.time()
-        repos = repo_fetcher.fetch()
-        if not repos:
-            print("❌ 未获取到任何仓库，程序退出")
+        if settings.batch_mode:
+            run_batch(
+                settings, data_processor, readme_extractor, stats_fetcher, graphql_enricher,
+                ai_analyzer, csv_exporter, markdown_exporter, snapshot_store
+            )
             return
 
-        # 3.2 处理数据
-        print(f"\n⚙️ [步骤 2/4] 正在深入分析 {len(repos)} 个仓库...")
+        # 3.1 获取数据（逐页产出，后续页面在后台预取）
+        print("\n📡 [步骤 1/4] 正在获取 GitHub Starred 仓库列表...")
+        start_time = time.time()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if settings.star_sync:
+            pages = chunked(repo_fetcher.sync(), StarredRepoFetcher.PER_PAGE)
+        else:
+            print(f"📡 开始获取用户 {settings.github_username} 的 Star 列表...")
+            pages = repo_fetcher.iter_pages()
+
+        # 3.2 处理数据 + 3.3 导出CSV（每页处理完立即写盘）
+        print(f"\n⚙️ [步骤 2/4] 正在逐页深入分析仓库...")
         print("   - 收集仓库基本信息（描述、链接、星标数）")
         print("   - 计算沉寂天数和活动状态")
         print("   - 获取近期活跃仓库的提交数据")
-
-        processed_data = data_processor.process_repositories(
-            repos, readme_extractor, stats_fetcher
-        )
+        print(f"\n💾 [步骤 3/4] 分析结果实时写入 CSV 文件...")
+
+        run_id = None
+        if snapshot_store is not None:
+            run_at = datetime.strptime(timestamp, '%Y%m%d_%H%M%S').strftime('%Y-%m-%dT%H:%M:%S')
+            run_id = snapshot_store.start_run(run_at, settings.github_username)
+
+        with csv_exporter.open_stream(timestamp, settings.csv_gzip, settings.csv_chunk_rows) as writer:
+            for rows in data_processor.iter_processed(
+                pages, readme_extractor, stats_fetcher, graphql_enricher
+            ):
+                writer.write_rows(rows)
+                if snapshot_store is not None:
+                    snapshot_store.append_rows(run_id, rows)
+                print(f"   ✓ 已处理 {writer.row_count} 个仓库")
+        csv_filename = writer.filename
+
+        if writer.row_count == 0:
+            print("❌ 未获取到任何仓库，程序退出")
+            return
 
         elapsed_total = time.time() - start_time
-        print(f"   ✓ 仓库分析完成! 总用时 {elapsed_total:.1f}s")
-
-        # 3.3 导出CSV
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        print(f"\n💾 [步骤 3/4] 正在保存原始数据到 CSV 文件...")
-        csv_filename = csv_exporter.export(processed_data, timestamp)
+        print(f"   ✓ 仓库分析完成! 共 {writer.row_count} 个，总用时 {elapsed_total:.1f}s")
+        print(f"   ✓ 数据已保存: {csv_filename}")
 
         # 3.4 生成分析报告
         print(f"\n🧠 [步骤 4/4] 正在通过 LLM 生成智能分析报告...")
@@ -78,21 +159,36 @@ def main():
         print("   - 生成健康度评分、风险评估和行动计划")
 
         import pandas as pd
-        df = pd.DataFrame(processed_data)
-        report = ai_analyzer.analyze(df)
-        md_filename = markdown_exporter.export(report, timestamp)
-
-        print(f"   ✓ AI 分析报告已生成: {md_filename}")
-        print("\n" + "="*50)
-        print("📊 分析报告内容:")
-        print("="*50)
-        print(report)
+        df = pd.read_csv(csv_filename, encoding="utf-8-sig", keep_default_na=False)
+        if settings.report_stream:
+            # 边生成边输出，中途退出时已生成部分保留在 .partial 文件中
+            print("\n" + "="*50)
+            print("📊 分析报告内容:")
+            print("="*50)
+            with markdown_exporter.open_stream(timestamp) as writer:
+                for chunk in ai_analyzer.stream(df, settings.github_username):
+                    print(chunk, end="", flush=True)
+                    writer.write(chunk)
+            md_filename = writer.filename
+            print("\n" + "="*50)
+            print(f"   ✓ AI 分析报告已生成: {md_filename}")
+        else:
+            report = ai_analyzer.analyze(df, settings.github_username)
+            md_filename = markdown_exporter.export(report, timestamp)
+
+            print(f"   ✓ AI 分析报告已生成: {md_filename}")
+            print("\n" + "="*50)
+            print("📊 分析报告内容:")
+            print("="*50)
+            print(report)
         print("\n" + "="*50)
         print("✅ 所有任务完成!")
         print("="*50)
         print(f"\n📁 输出文件位置:")
         print(f"   📊 CSV文件: csv_output/")
         print(f"   📝 报告文件: reports/")
+        if snapshot_store is not None:
+            print(f"   🗄️ 历史快照: {settings.history_db}")
         print("="*50)
 
     except Exception as e:
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""本地模拟 GitHub API 和 LLM 服务，用于端到端压测
+
+覆盖程序实际调用的接口：
+- GET  /users/{user}/starred            分页（Link 头）、支持 star+json 媒体类型
+- GET  /repos/{owner}/{repo}/stats/participation  首次请求可返回 202
+- GET  /repos/{owner}/{repo}/commits/{branch}
+- GET  /repos/{owner}/{repo}/readme     支持 raw 媒体类型
+- GET  /orgs/{org}/members
+- POST /graphql                         批量 repository 别名查询（pushedAt、提交数、README blob）
+- POST /v1/chat/completions             OpenAI 兼容接口（支持 stream）
+- GET  /__stats                         各接口的请求计数（304 计入 "<接口>_304"）
+
+所有数据由仓库序号和随机种子确定性生成，不占用内存。
+GET 接口的 200 响应带 ETag，请求头 If-None-Match 命中时返回 304 且不扣配额，
+与 GitHub 的条件请求行为一致。
+
+用法:
+    python scripts/mock_github_server.py --stars 50000 --latency-ms 40 --error-rate 0.01
+
+然后在 .env 中配置:
+    GITHUB_API_BASE=http://127.0.0.1:8765
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1
+"""
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+LANGUAGES = ["Python", "TypeScript", "Go", "Rust", "JavaScript", "C++", "Java", None]
+TOPICS = ["cli", "llm", "web", "database", "devtools", "machine-learning", "kubernetes", "security"]
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+STAR_MEDIA_TYPE = "application/vnd.github.star+json"
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+README_TEMPLATE = """# {name}
+
+[![build](https://img.shields.io/badge/build-passing-green.svg)](https://example.com)
+
+{name} is a synthetic {language} project used for load testing. It provides
+fast, reliable utilities for {topic} workflows and ships with batteries included.
+
+## Installation
+
+```bash
+pip install {name}
+```
+
+## Usage
+
+| Option | Description |
+| ------ | ----------- |
+| --fast | Go faster   |
+
+"""
+
+# 没有明确简介的 README，本地抽取置信度低，需要交给 LLM 总结
+VAGUE_README_TEMPLATE = """# {name}
+
+## Table of Contents
+
+- [Install](#install)
+- [Usage](#usage)
+
+## Install
+
+```bash
+pip install {name}
+```
+
+## Usage
+
+Run {name} with the options below to process {topic} data in {language}.
+
+"""
+
+
+class MockState:
+    """服务端配置和运行时状态"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.now = datetime.now(timezone.utc)
+        self.lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.participation_seen: set = set()
+        # token -> (剩余配额, 窗口重置时间)
+        self.quota: Dict[str, Tuple[int, int]] = {}
+
+    def rng(self, *parts: Any) -> random.Random:
+        """按种子和参数派生确定的随机数生成器"""
+        return random.Random(f"{self.args.seed}:{':'.join(map(str, parts))}")
+
+    def repo_name(self, index: int) -> str:
+        return f"owner{index % 997}/repo-{index}"
+
+    @staticmethod
+    def repo_index(full_name: str) -> Optional[int]:
+        match = re.fullmatch(r"owner\d+/repo-(\d+)", full_name)
+        return int(match.group(1)) if match else None
+
+    def repo(self, index: int) -> Dict[str, Any]:
+        """生成与 GitHub API 结构一致的仓库记录"""
+        rng = self.rng("repo", index)
+        name = self.repo_name(index)
+        created = self.now - timedelta(days=rng.randint(30, 4000))
+        pushed = self.now - timedelta(days=rng.randint(0, 1500), seconds=rng.randint(0, 86399))
+        stars = int(rng.paretovariate(1.2) * 10)
+        return {
+            "full_name": name,
+            "description": None if rng.random() < self.args.missing_description_rate else f"Synthetic project {index}",
+            "html_url": f"https://github.com/{name}",
+            "language": rng.choice(LANGUAGES),
+            "stargazers_count": stars,
+            "pushed_at": pushed.strftime(DATE_FORMAT),
+            "default_branch": "main",
+            "updated_at": pushed.strftime(DATE_FORMAT),
+            "created_at": created.strftime(DATE_FORMAT),
+            "archived": rng.random() < 0.05,
+            "disabled": rng.random() < 0.005,
+            "watchers_count": stars,
+            "subscribers_count": stars // 20,
+            "forks_count": stars // 8,
+            "open_issues_count": rng.randint(0, 300),
+            "has_issues": rng.random() < 0.95,
+            "topics": rng.sample(TOPICS, rng.randint(0, 4)),
+        }
+
+    def weekly_commits(self, full_name: str) -> list:
+        """最近 52 周的提交数，REST participation 和 GraphQL history 共用"""
+        rng = self.rng("participation", full_name)
+        return [max(0, int(rng.gauss(8, 6))) for _ in range(52)]
+
+    def commit_message(self, full_name: str) -> str:
+        return self.rng("commit", full_name).choice([
+            "Fix race condition in cache eviction",
+            "Bump dependencies",
+            "Add support for streaming responses\n\nLonger body text.",
+            "Release v2.3.0",
+            "Refactor parser for better error messages",
+        ])
+
+    def starred_at(self, index: int) -> str:
+        """Star 时间按序号递减，与 sort=created&direction=desc 一致"""
+        return (self.now - timedelta(minutes=10 * index)).strftime(DATE_FORMAT)
+
+    def readme(self, index: int) -> str:
+        rng = self.rng("readme", index)
+        repo = self.repo(index)
+        template = VAGUE_README_TEMPLATE if rng.random() < self.args.vague_readme_rate else README_TEMPLATE
+        text = template.format(
+            name=repo["full_name"].split("/")[1],
+            language=repo["language"] or "polyglot",
+            topic=rng.choice(TOPICS),
+        )
+        # 填充到目标大小附近，模拟长 README
+        size = int(rng.expovariate(1 / max(1, self.args.readme_kb * 1024)))
+        filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+        return text + filler * (size // len(filler))
+
+    def latency(self) -> float:
+        """按配置的分布抽取一次延迟（秒）"""
+        mean = self.args.latency_ms / 1000
+        if mean <= 0:
+            return 0.0
+        dist = self.args.latency_dist
+        if dist == "fixed":
+            return mean
+        if dist == "uniform":
+            return random.uniform(0, 2 * mean)
+        if dist == "exp":
+            return random.expovariate(1 / mean)
+        # lognormal: 均值为 mean，长尾
+        sigma = 0.8
+        return random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+
+    def take_quota(self, token: str) -> Tuple[int, int, bool]:
+        """扣减配额，返回 (剩余, 重置时间, 是否允许)"""
+        limit = self.args.rate_limit
+        with self.lock:
+            now = int(time.time())
+            remaining, reset_at = self.quota.get(token, (limit, now + self.args.rate_window))
+            if now >= reset_at:
+                remaining, reset_at = limit, now + self.args.rate_window
+            allowed = remaining > 0
+            if allowed:
+                remaining -= 1
+            self.quota[token] = (remaining, reset_at)
+            return remaining, reset_at, allowed
+
+    def refund_quota(self, token: str):
+        """304 响应不计入配额"""
+        with self.lock:
+            if token in self.quota:
+                remaining, reset_at = self.quota[token]
+                self.quota[token] = (min(self.args.rate_limit, remaining + 1), reset_at)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """请求分发"""
+
+    protocol_version = "HTTP/1.1"
+    state: MockState
+
+    def log_message(self, format, *args):
+        if self.state.args.verbose:
+            super().log_message(format, *args)
+
+    # ---------- 通用 ----------
+
+    def _send(self, status: int, body: Any = b"", headers: Optional[Dict[str, str]] = None,
+              content_type: str = "application/json; charset=utf-8"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _count(self, endpoint: str):
+        with self.state.lock:
+            self.state.counts[endpoint] += 1
+
+    def _github_preamble(self, endpoint: str, resource: str = "core") -> Optional[Dict[str, str]]:
+        """模拟延迟、限流和 5xx，返回限流响应头；已直接响应时返回 None"""
+        self._count(endpoint)
+        time.sleep(self.state.latency())
+
+        token = self.headers.get("Authorization", "anonymous")
+        remaining, reset_at, allowed = self.state.take_quota(f"{resource}:{token}")
+        rate_headers = {
+            "X-RateLimit-Limit": str(self.state.args.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset_at),
+            "X-RateLimit-Used": str(self.state.args.rate_limit - remaining),
+            "X-RateLimit-Resource": resource,
+        }
+        if not allowed:
+            self._send(403, {"message": "API rate limit exceeded"}, rate_headers)
+            return None
+        if random.random() < self.state.args.error_rate:
+            self._send(random.choice([500, 502, 503]), {"message": "Server Error"}, rate_headers)
+            return None
+        return rate_headers
+
+    def _send_cacheable(self, endpoint: str, body: Any, headers: Dict[str, str],
+                        content_type: str = "application/json; charset=utf-8"):
+        """带 ETag 的 200 响应；If-None-Match 命中时返回无正文的 304"""
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = dict(headers, ETag=etag)
+        candidates = [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+        if etag in candidates or f"W/{etag}" in candidates:
+            self._count(f"{endpoint}_304")
+            self.state.refund_quota(f"core:{self.headers.get('Authorization', 'anonymous')}")
+            return self._send(304, b"", headers, content_type=content_type)
+        self._send(200, body, headers, content_type=content_type)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        query = parse_qs(url.query)
+
+        if path == "/__stats":
+            with self.state.lock:
+                return self._send(200, dict(self.state.counts))
+
+        routes = (
+            (r"/users/([^/]+)/starred", self._starred),
+            (r"/orgs/([^/]+)/members", self._members),
+            (r"/repos/([^/]+/[^/]+)/stats/participation", self._participation),
+            (r"/repos/([^/]+/[^/]+)/commits/([^/]+)", self._commit),
+            (r"/repos/([^/]+/[^/]+)/readme", self._readme),
+        )
+        for pattern, handler in routes:
+            match = re.fullmatch(pattern, path)
+            if match:
+                return handler(query, *match.groups())
+        self._count("not_found")
+        self._send(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = urlparse(self.path).path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            return self._chat_completion(json.loads(body or b"{}"))
+        if path == "/graphql":
+            return self._graphql(json.loads(body or b"{}"))
+        self._count("not_found")
+        self._send(404, {"message": "Not Found"})
+
+    # ---------- GitHub ----------
+
+    def _page_link(self, base: str, query: Dict[str, list], page: int, last: int) -> str:
+        per_page = query.get("per_page", ["30"])[0]
+        params = {k: v[0] for k, v in query.items() if k not in ("page", "per_page")}
+        extra = "".join(f"&{k}={v}" for k, v in params.items())
+        host = self.headers.get("Host", "127.0.0.1")
+        links = []
+        if page < last:
+            links.append(f'<http://{host}{base}?per_page={per_page}{extra}&page={page + 1}>; rel="next"')
+            links.append(f'<http://{host}{base}?per_page={per_page}{extra}&page={last}>; rel="last"')
+        if page > 1:
+            links.append(f'<http://{host}{base}?per_page={per_page}{extra}&page=1>; rel="first"')
+            links.append(f'<http://{host}{base}?per_page={per_page}{extra}&page={page - 1}>; rel="prev"')
+        return ", ".join(links)
+
+    def _starred(self, query: Dict[str, list], user: str):
+        headers = self._github_preamble("starred")
+        if headers is None:
+            return
+        per_page = min(100, int(query.get("per_page", ["30"])[0]))
+        page = max(1, int(query.get("page", ["1"])[0]))
+        total = self.state.args.stars
+        last = max(1, math.ceil(total / per_page))
+        start = (page - 1) * per_page
+        indexes = range(start, min(total, start + per_page))
+
+        if STAR_MEDIA_TYPE in self.headers.get("Accept", ""):
+            items = [{"starred_at": self.state.starred_at(i), "repo": self.state.repo(i)} for i in indexes]
+        else:
+            items = [self.state.repo(i) for i in indexes]
+        link = self._page_link(f"/users/{user}/starred", query, page, last)
+        if link:
+            headers["Link"] = link
+        self._send_cacheable("starred", items, headers)
+
+    def _members(self, query: Dict[str, list], org: str):
+        headers = self._github_preamble("members")
+        if headers is None:
+            return
+        members = [{"login": f"member{i}"} for i in range(self.state.args.org_members)]
+        self._send_cacheable("members", members, headers)
+
+    def _participation(self, query: Dict[str, list], full_name: str):
+        headers = self._github_preamble("participation")
+        if headers is None:
+            return
+        with self.state.lock:
+            first = full_name not in self.state.participation_seen
+            self.state.participation_seen.add(full_name)
+        if first and random.random() < self.state.args.accepted_rate:
+            return self._send(202, {}, headers)
+        weekly = self.state.weekly_commits(full_name)
+        self._send_cacheable("participation", {"all": weekly, "owner": [w // 2 for w in weekly]}, headers)
+
+    def _commit(self, query: Dict[str, list], full_name: str, branch: str):
+        headers = self._github_preamble("commits")
+        if headers is None:
+            return
+        sha = f"{self.state.rng('sha', full_name).getrandbits(160):040x}"
+        self._send_cacheable("commits", {
+            "sha": sha,
+            "commit": {"message": self.state.commit_message(full_name),
+                       "author": {"name": "mock", "date": self.state.now.strftime(DATE_FORMAT)}},
+        }, headers)
+
+    def _readme(self, query: Dict[str, list], full_name: str):
+        headers = self._github_preamble("readme")
+        if headers is None:
+            return
+        index = self.state.repo_index(full_name)
+        if index is None or index >= self.state.args.stars:
+            return self._send(404, {"message": "Not Found"}, headers)
+        text = self.state.readme(index).encode("utf-8")
+        if RAW_MEDIA_TYPE in self.headers.get("Accept", ""):
+            return self._send_cacheable("readme", text, headers, content_type="text/plain; charset=utf-8")
+        self._send_cacheable("readme", {
+            "name": "README.md",
+            "encoding": "base64",
+            "content": base64.b64encode(text).decode("ascii"),
+        }, headers)
+
+    def _graphql(self, payload: Dict[str, Any]):
+        """按 GraphQLEnricher 生成的别名查询返回数据
+
+        只解析 `rN: repository(owner: "...", name: "...") { ... }` 形式的顶层字段，
+        按字段中是否包含 defaultBranchRef / readmeN 决定返回内容；
+        README 只放在 readme0（README.md），按 --graphql-readme-miss-rate 的比例全部置空，
+        用于覆盖客户端回退到 REST /readme 的路径。
+        """
+        headers = self._github_preamble("graphql", resource="graphql")
+        if headers is None:
+            return
+        query = str(payload.get("query", ""))
+        pattern = r'^(\w+): repository\(owner: ("[^"]*"), name: ("[^"]*")\) \{ (.*) \}$'
+        data: Dict[str, Any] = {}
+        errors = []
+        for alias, owner, name, fields in re.findall(pattern, query, flags=re.MULTILINE):
+            full_name = f"{json.loads(owner)}/{json.loads(name)}"
+            index = self.state.repo_index(full_name)
+            if index is None or index >= self.state.args.stars:
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias],
+                               "message": f"Could not resolve to a Repository with the name '{full_name}'."})
+                continue
+            node: Dict[str, Any] = {"pushedAt": self.state.repo(index)["pushed_at"]}
+            if "defaultBranchRef" in fields:
+                node["defaultBranchRef"] = {"target": {
+                    "message": self.state.commit_message(full_name),
+                    "history": {"totalCount": sum(self.state.weekly_commits(full_name))},
+                }}
+            readme_aliases = re.findall(r"(readme\d+): object", fields)
+            if readme_aliases:
+                missing = self.state.rng("graphql-readme", index).random() < self.state.args.graphql_readme_miss_rate
+                for i, readme_alias in enumerate(readme_aliases):
+                    node[readme_alias] = {"text": self.state.readme(index)} if i == 0 and not missing else None
+            data[alias] = node
+        body: Dict[str, Any] = {"data": data}
+        if errors:
+            body["errors"] = errors
+        self._send(200, body, headers)
+
+    # ---------- LLM ----------
+
+    def _chat_completion(self, payload: Dict[str, Any]):
+        self._count("chat_completions")
+        time.sleep(self.state.args.llm_latency_ms / 1000)
+        if random.random() < self.state.args.llm_error_rate:
+            return self._send(503, {"error": {"message": "Service Unavailable"}})
+
+        messages = payload.get("messages") or [{"content": ""}]
+        prompt = str(messages[-1].get("content", ""))
+        content = self._fake_reply(prompt)
+        prompt_tokens, completion_tokens = len(prompt) // 3 + 1, len(content) // 3 + 1
+        model = payload.get("model", "mock-model")
+        created = int(time.time())
+
+        if payload.get("stream"):
+            return self._stream_completion(content, model, created)
+
+        self._send(200, {
+            "id": f"chatcmpl-mock-{created}",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    def _stream_completion(self, content: str, model: str, created: int):
+        """以 SSE 分块返回"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_event(data: str):
+            event = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+
+        for i in range(0, len(content), 20):
+            if i:
+                time.sleep(self.state.args.llm_chunk_delay_ms / 1000)
+            write_event(json.dumps({
+                "id": f"chatcmpl-mock-{created}", "object": "chat.completion.chunk",
+                "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[i:i + 20]}, "finish_reason": None}],
+            }, ensure_ascii=False))
+        write_event(json.dumps({
+            "id": f"chatcmpl-mock-{created}", "object": "chat.completion.chunk",
+            "created": created, "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }))
+        write_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _fake_reply(prompt: str) -> str:
+        """根据提示词生成占位回复：总结请求返回短句，其余返回 Markdown 报告骨架"""
+        batch = re.findall(r"^\s*### 仓库: (\S+)$", prompt, flags=re.MULTILINE)
+        if batch:
+            return json.dumps({name: f"模拟总结: {name} 是一个用于压测的合成项目" for name in batch},
+                              ensure_ascii=False)
+        if "README内容" in prompt:
+            words = re.findall(r"[A-Za-z][A-Za-z\-]{3,}", prompt.split("README内容", 1)[-1])
+            return "模拟总结: " + " ".join(words[:6])
+        section = re.search(r'以二级标题 "## (.+?)" 开头', prompt)
+        if section:
+            return f"## {section.group(1)}\n\n" + "这是本地模拟服务返回的占位内容。" * 5
+        return "# 模拟分析报告\n\n" + "\n\n".join(
+            f"## {i}. 模拟章节\n\n这是本地模拟服务返回的占位内容。" for i in range(1, 8)
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="本地模拟 GitHub API 和 LLM 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stars", type=int, default=1000, help="每个用户的 Star 数 (默认: 1000)")
+    parser.add_argument("--seed", type=int, default=42, help="数据生成种子")
+    parser.add_argument("--latency-ms", type=float, default=0, help="GitHub 接口平均延迟 (毫秒)")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exp", "lognormal"],
+                        default="lognormal", help="延迟分布 (默认: lognormal)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="GitHub 接口返回 5xx 的概率")
+    parser.add_argument("--accepted-rate", type=float, default=0.3,
+                        help="participation 首次请求返回 202 的概率 (默认: 0.3)")
+    parser.add_argument("--rate-limit", type=int, default=5000,
+                        help="每个 token 每窗口的配额，与 GitHub 认证用户的 core 配额一致 (默认: 5000)")
+    parser.add_argument("--rate-window", type=int, default=3600, help="配额窗口秒数 (默认: 3600)")
+    parser.add_argument("--readme-kb", type=float, default=4, help="README 平均大小 (KB)")
+    parser.add_argument("--vague-readme-rate", type=float, default=0.3,
+                        help="没有明确简介的 README 比例 (默认: 0.3)")
+    parser.add_argument("--missing-description-rate", type=float, default=0.1,
+                        help="没有描述、需要总结 README 的仓库比例 (默认: 0.1)")
+    parser.add_argument("--graphql-readme-miss-rate", type=float, default=0.1,
+                        help="GraphQL 查询中常见文件名都取不到 README 的仓库比例 (默认: 0.1)")
+    parser.add_argument("--org-members", type=int, default=5, help="组织成员数")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="LLM 接口延迟 (毫秒)")
+    parser.add_argument("--llm-chunk-delay-ms", type=float, default=0,
+                        help="流式响应每个分块之间的间隔 (毫秒)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="LLM 接口返回 503 的概率")
+    parser.add_argument("--verbose", action="store_true", help="打印每个请求")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    MockHandler.state = MockState(args)
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    server.daemon_threads = True
+    base = f"http://{args.host}:{args.port}"
+    print(f"🧪 模拟服务已启动: {base} ({args.stars} stars/用户)")
+    print(f"   GITHUB_API_BASE={base}")
+    print(f"   OPENAI_API_BASE={base}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 已停止")
+        with MockHandler.state.lock:
+            print(f"   请求统计: {dict(MockHandler.state.counts)}")
+
+
+if __name__ == "__main__":
+    main()
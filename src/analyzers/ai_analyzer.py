@@ -1,67 +1,25 @@
 """AI分析模块"""
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
 import pandas as pd
-from langchain_openai import ChatOpenAI
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from config.settings import Settings
+from storage.report_cache import ReportCache
+from utils.llm import estimate_tokens, throttled_chat_model
 
 
 class AIAnalyzer:
     """AI分析器"""
 
-    def __init__(self, settings: Settings):
-        self.settings = settings
-        self.llm = ChatOpenAI(
-            model_name=settings.llm_model_name,
-            temperature=0.6,
-            openai_api_key=settings.openai_api_key,
-            openai_api_base=settings.openai_api_base
-        )
-
-    def analyze(self, df: pd.DataFrame) -> str:
-        """分析仓库数据并生成报告"""
-        # 构建分析上下文
-        total_count = len(df)
-
-        # 按状态分类
-        archived_count = len(df[df['仓库状态'].str.contains('已归档', na=False)])
-        disabled_count = len(df[df['仓库状态'].str.contains('已禁用', na=False)])
-
-        # 按更新时间分类
-        active_recent = len(df[(df['沉寂天数'] >= 0) & (df['沉寂天数'] < 180)])
-        inactive_half_yr = len(df[(df['沉寂天数'] >= 180) & (df['沉寂天数'] <= 365)])
-        inactive_1yr = len(df[df['沉寂天数'] > 365])
-
-        # 选取已归档项目 Top 5（高风险）
-        archived_projects = df[df['仓库状态'].str.contains('已归档', na=False)].sort_values("Star数", ascending=False).head(5)
-        archived_str = "\n".join(
-            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  ⚠️ 项目已归档，建议立即制定迁移计划 (Star: {row['Star数']}, Fork: {row['Fork数']})"
-             for _, row in archived_projects.iterrows()]
-        ) if not archived_projects.empty else "无已归档项目"
-
-        # 选取近期活跃项目（<180天）Top 5
-        top_active = df[df['沉寂天数'] < 180].sort_values("关注者数", ascending=False).head(5)
-        active_str = "\n".join(
-            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  更新于{row['最近更新日期']}，更新内容: {row['最近更新内容']} (关注者: {row['关注者数']}, Issues: {row['开放Issues']})"
-             for _, row in top_active.iterrows()]
-        )
-
-        # 选取沉寂半年到一年的项目 Top 5
-        half_yr_projects = df[(df['沉寂天数'] >= 180) & (df['沉寂天数'] <= 365)].sort_values("Star数", ascending=False).head(5)
-        half_yr_str = "\n".join(
-            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  已停更{row['沉寂天数']}天 (Star: {row['Star数']}, 关注者: {row['关注者数']}, Issues: {row['开放Issues']}, 标签: {row['项目标签']})"
-             for _, row in half_yr_projects.iterrows()]
-        )
-
-        # 选取超过一年的项目 Top 5
-        dead_giants = df[df['沉寂天数'] > 365].sort_values("Star数", ascending=False).head(5)
-        dead_str = "\n".join(
-            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  🚨 已停更{row['沉寂天数']}天 (Star: {row['Star数']}, 关注者: {row['关注者数']}, Fork: {row['Fork数']}, 项目年龄: {row['项目年龄']}, 标签: {row['项目标签']})"
-             for _, row in dead_giants.iterrows()]
-        )
-
-        # 构建分析提示
-        template = """
+    REPORT_PROMPT = """
         你是一名技术资产管理专家。请根据用户的 GitHub Star 数据生成一份详细的分析报告。
 
         【数据概览】
@@ -84,6 +42,8 @@ class AIAnalyzer:
         【长期沉寂项目 (超过1年未更新) - 高风险】
         {dead_str}
 
+        {extra_context}
+
         【任务】
         请生成一份 Markdown 格式的详细分析报告，包含以下部分：
 
@@ -133,12 +93,609 @@ class AIAnalyzer:
         - 在分析中充分利用项目标签信息判断项目类型和用途
         """
 
-        prompt = PromptTemplate.from_template(template)
+    # 分部分并发生成时的提示词，每部分只带自己需要的数据
+    SECTION_PROMPT = """
+        你是一名技术资产管理专家，正在根据用户的 GitHub Star 数据撰写一份分析报告中的一个部分。
+
+        【数据概览】
+        - 关注项目总数: {total_count}
+        - 已归档项目: {archived_count} ⚠️ 高风险
+        - 禁用项目: {disabled_count} 🚨 极高风险
+        - 活跃项目(近6个月内有更新): {active_recent}
+        - 沉寂项目(6个月-1年未更新): {inactive_half_yr}
+        - 长期沉寂项目(超过1年未更新): {inactive_1yr}
+
+        {section_data}
+
+        {extra_context}
+
+        【任务】
+        只撰写报告中的这一部分，以二级标题 "## {title}" 开头，使用 Markdown 格式，不要撰写其他部分：
+        {instructions}
+
+        要求：
+        - 保持语气专业、客观但紧迫
+        - 每个建议都要具体可行，包含具体操作步骤
+        - 重点关注安全和长期维护性问题
+        - 特别标注高风险项目并给出紧急行动建议
+        - 在分析中充分利用项目标签信息判断项目类型和用途
+        """
+
+    # 报告各部分: (标题, 该部分使用的数据, 写作要求, 引用的分片摘要分组)
+    # 分片摘要分组为 None 时引用全部分组的合并摘要
+    SECTIONS = (
+        (
+            "1. 整体健康度评估",
+            "",
+            """- 给出关于用户关注技术栈的整体健康度评分（0-10分）和简短评价
+        - 分析活跃项目占比和风险项目占比
+        - 特别评估已归档和禁用项目的影响""",
+            None,
+        ),
+        (
+            "2. 已归档项目评估 - 立即处理",
+            "【已归档项目 - 立即行动】\n{archived_str}",
+            """- 已归档项目是维护者认为已结束的项目，需要立即制定迁移计划
+        - 为每个已归档项目提供替代方案建议
+        - 评估这些项目停用对你的影响""",
+            ("已归档/禁用",),
+        ),
+        (
+            "3. 活跃项目分析",
+            "【近期活跃项目 (近6个月内有更新)】\n{active_str}",
+            """- 对每个"近期活跃项目"，根据其编程语言、项目描述和标签判断项目类型
+        - 对其更新内容进行技术解读（推测是在修Bug、发新版、功能迭代等）
+        - 评估这些项目在你工作流中的潜在价值和依赖风险""",
+            ("近期活跃",),
+        ),
+        (
+            "4. 沉寂项目分析 (6个月-1年未更新)",
+            "【沉寂项目 (6个月-1年未更新) - 需关注】\n{half_yr_str}",
+            """- 根据项目标签和描述分析项目类型（工具类、库类、应用类等）
+        - 评估不同类型项目的合理沉寂期（工具类可容忍更长时间不更新）
+        - 评估项目是否仍有使用价值和安全性
+        - 提供具体建议：是否需要寻找替代品、是否可以继续使用、或需要迁移
+        - 特别关注高Star数和高关注者数的项目""",
+            ("沉寂半年到一年",),
+        ),
+        (
+            "5. 长期沉寂项目分析 (超过1年未更新) - 高风险评估",
+            "【长期沉寂项目 (超过1年未更新) - 高风险】\n{dead_str}",
+            """- 对这些项目进行深度分析，考虑项目年龄判断是"稳定成熟"还是"废弃"
+        - 评估安全风险（漏洞未修复）和技术债务
+        - 强烈建议寻找替代品或制定迁移计划
+        - 说明如果这些项目对你的工作很重要，应该采取什么措施（Fork项目、寻找替代、联系维护者等）""",
+            ("长期沉寂",),
+        ),
+        (
+            "6. 社区活跃度分析",
+            "【Star 数最高的项目社区数据】\n{community_str}",
+            """- 分析关注者vsStar比率，评估真实关注度
+        - 分析Fork数量，评估社区参与度和替代方案可得性
+        - 分析开放Issues数量，评估项目维护负载""",
+            (),
+        ),
+        (
+            "7. 行动计划建议",
+            "【已归档项目】\n{archived_str}\n\n【沉寂项目】\n{half_yr_str}\n\n【长期沉寂项目】\n{dead_str}",
+            """- 按风险等级整理优先级清单：已归档 > 禁用 > 长期沉寂 > 沉寂 > 活跃
+        - 为每个类别提供具体的下一步行动建议
+        - 给出时间建议（立即、1周内、1个月内等）""",
+            (),
+        ),
+    )
+    # 每个部分的最多尝试次数
+    SECTION_ATTEMPTS = 3
+
+    # 报告版本，修改报告提示词后需递增，使缓存的报告失效
+    REPORT_VERSION = "1"
+    # 参与指纹比较的分组: 键 -> 标题，除 overview 外对应上下文中的 {键}_str
+    BUCKET_TITLES = {
+        "overview": "数据概览",
+        "archived": "已归档项目",
+        "active": "近期活跃项目",
+        "half_yr": "沉寂项目 (6个月-1年未更新)",
+        "dead": "长期沉寂项目 (超过1年未更新)",
+        "community": "Star 数最高的项目社区数据",
+    }
+    # 指纹只取重点项目中不会每天自然变化的字段（不含沉寂天数、Star数等）
+    FINGERPRINT_FIELDS = ["仓库名", "仓库状态", "最近更新日期", "最近更新内容"]
+
+    DELTA_PROMPT = """
+        你是一名技术资产管理专家。用户的 GitHub Star 数据自上次分析（{previous_at}）以来，以下部分发生了变化：
+
+        {changes}
+
+        【任务】
+        请用 Markdown 撰写一份简短的变化报告（不超过500字），以二级标题 "## 本次变化" 开头：
+        - 逐项说明每个变化部分中新增、移出或状态改变的项目，以及数量变化
+        - 指出变化带来的新风险（如新归档、转入长期沉寂）或风险解除
+        - 给出针对这些变化的具体行动建议
+        不要重复未变化的内容。
+        """
+
+    SHARD_PROMPT = """
+        你是一名技术资产管理专家。以下是用户 GitHub Star 中的一组项目（分组: {group}，共 {count} 个），
+        每行格式为: 仓库名 [语言] Star数 沉寂天数 标签 | 描述
+
+        {rows}
+
+        请用不超过300字总结这组项目，供后续汇总成完整报告：
+        1. 主要技术方向和项目类型
+        2. 值得重点关注的项目（写出仓库名）及原因：高风险、已归档、长期停更但 Star 高等
+        3. 可能的替代方案或迁移建议要点
+        只输出总结内容。
+        """
+
+    COMBINE_PROMPT = """
+        以下是若干组 GitHub Star 项目的分析摘要（{group}），请合并为一份不超过400字的摘要，
+        保留所有被点名的高风险项目和迁移建议，去除重复内容：
+
+        {rows}
+        """
+
+    # 活跃度分组: (名称, 筛选条件)，按顺序归组，每个项目只进入第一个匹配的分组
+    BUCKETS = (
+        ("已归档/禁用", lambda df: df['仓库状态'].str.contains('已归档|已禁用', na=False)),
+        ("近期活跃", lambda df: (df['沉寂天数'] >= 0) & (df['沉寂天数'] < 180)),
+        ("沉寂半年到一年", lambda df: (df['沉寂天数'] >= 180) & (df['沉寂天数'] <= 365)),
+        ("长期沉寂", lambda df: df['沉寂天数'] > 365),
+        # 兜底：推送时间缺失（沉寂天数为 -1）等无法判断活跃度的项目
+        ("未知活跃度", lambda df: pd.Series(True, index=df.index)),
+    )
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.llm = throttled_chat_model(settings, temperature=0.6, max_output_tokens=4000)
+        self._report_chain = PromptTemplate.from_template(self.REPORT_PROMPT) | self.llm | StrOutputParser()
+        section_llm = throttled_chat_model(settings, temperature=0.6, max_output_tokens=1200)
+        self._section_chain = PromptTemplate.from_template(self.SECTION_PROMPT) | section_llm | StrOutputParser()
+        shard_llm = throttled_chat_model(settings, temperature=0.3, max_output_tokens=600)
+        self._shard_chain = PromptTemplate.from_template(self.SHARD_PROMPT) | shard_llm | StrOutputParser()
+        self._combine_chain = PromptTemplate.from_template(self.COMBINE_PROMPT) | shard_llm | StrOutputParser()
+        delta_llm = throttled_chat_model(settings, temperature=0.6, max_output_tokens=1000)
+        self._delta_chain = PromptTemplate.from_template(self.DELTA_PROMPT) | delta_llm | StrOutputParser()
+
+        self.report_cache = None
+        if settings.report_memo:
+            self.report_cache = ReportCache(os.path.join(settings.cache_dir, "reports.sqlite3"))
+
+    def analyze(self, df: pd.DataFrame, name: Optional[str] = None) -> str:
+        """分析仓库数据并生成报告，name 用于区分批量模式下的不同用户"""
+        return "".join(self.stream(df, name))
+
+    def stream(self, df: pd.DataFrame, name: Optional[str] = None) -> Iterator[str]:
+        """分析仓库数据，逐段产出生成中的报告
+
+        启用报告缓存时先比较各分组的输入指纹：与上次完全相同则直接复用上次的报告；
+        与上次完整报告相比只有少数分组变化时只生成这些分组的变化报告，附在该完整报告之前。
+        变化报告生成失败时改为生成完整报告。
+        """
+        context = self._build_context(df)
+        scope = f"{name or ''}:{self.settings.llm_model_name}:{self.REPORT_VERSION}"
+        memo = self.report_cache.get(scope) if self.report_cache is not None else None
+
+        if memo is not None and memo["last"]["fingerprints"] == context["fingerprints"]:
+            print(f"   ♻️ 分析输入与 {memo['last']['at']} 相同，复用上次的报告")
+            yield memo["last"]["report"]
+            return
+        if memo is not None and self._delta_applicable(memo, context["fingerprints"]):
+            errors: List[str] = []
+            yield from self._stream_delta(scope, memo, context, errors)
+            if not errors:
+                return
+            print("   🔁 改为生成完整报告")
+
+        chunks: List[str] = []
+        failures: List[str] = []
+        for chunk in self._stream_full(df, context, failures):
+            chunks.append(chunk)
+            yield chunk
+        # 有部分生成失败的报告不缓存，下次重新生成
+        if self.report_cache is not None and not failures:
+            now = self._now()
+            entry = {"report": "".join(chunks), "fingerprints": context["fingerprints"],
+                     "inputs": self._bucket_inputs(context), "at": now}
+            self.report_cache.put(scope, {"base": {**entry, "ts": time.time()}, "last": entry})
+
+    def _delta_applicable(self, memo: Dict[str, Any], fingerprints: Dict[str, str]) -> bool:
+        """完整报告未过期且与之相比变化的分组不超过一半时，只生成变化报告"""
+        base = memo["base"]
+        refresh_days = self.settings.report_refresh_days
+        if refresh_days > 0 and time.time() - base["ts"] > refresh_days * 86400:
+            return False
+        return len(self._changed_buckets(base, fingerprints)) <= len(fingerprints) // 2
+
+    @staticmethod
+    def _changed_buckets(reference: Dict[str, Any], fingerprints: Dict[str, str]) -> List[str]:
+        """与参照报告相比输入指纹变化的分组"""
+        return [key for key, value in fingerprints.items() if reference["fingerprints"].get(key) != value]
+
+    def _stream_delta(
+        self,
+        scope: str,
+        memo: Dict[str, Any],
+        context: Dict[str, Any],
+        errors: List[str]
+    ) -> Iterator[str]:
+        """生成相对上次完整报告的变化报告，后附该完整报告
+
+        变化的判断和前后对比都以完整报告为参照，与附在文末的内容一致。
+        模型在产出任何内容前失败时不产出内容，只把错误记入 errors，由调用方改为完整生成；
+        中途失败时附上完整报告和提示，且不更新缓存。
+        """
+        base = memo["base"]
+        inputs = self._bucket_inputs(context)
+        changed = self._changed_buckets(base, context["fingerprints"])
+        print(f"   🔀 与 {base['at']} 的完整报告相比只有 {len(changed)} 个分组变化，生成变化报告")
+
+        changes = "\n\n".join(
+            f"【{self.BUCKET_TITLES[key]}】\n上次:\n{base['inputs'].get(key, '无')}\n本次:\n{inputs[key]}"
+            for key in changed
+        )
+        header = (
+            f"# GitHub Star 变化报告\n\n"
+            f"> 与 {base['at']} 生成的完整报告相比发生变化的部分: "
+            f"{'、'.join(self.BUCKET_TITLES[key] for key in changed)}。该完整报告附在文末。\n\n"
+        )
+        footer = f"\n\n---\n\n{base['report']}"
+        chunks: List[str] = []
+        try:
+            for chunk in self._delta_chain.stream({"previous_at": base["at"], "changes": changes}):
+                if not chunks:
+                    chunks.append(header)
+                    yield header
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            print(f"\n   ⚠️ 变化报告生成失败: {str(e)[:50]}")
+            if not chunks:
+                errors.append(str(e))
+                return
+            yield f"\n\n> ⚠️ 变化报告生成中断: {str(e)[:100]}"
+            yield footer
+            return
+        if not chunks:
+            chunks.append(header)
+            yield header
+        chunks.append(footer)
+        yield footer
+
+        self.report_cache.put(scope, {
+            "base": base,
+            "last": {"report": "".join(chunks), "fingerprints": context["fingerprints"],
+                     "inputs": inputs, "at": self._now()},
+        })
+
+    def _bucket_inputs(self, context: Dict[str, Any]) -> Dict[str, str]:
+        """各分组送入模型的内容，用于变化报告中前后对比"""
+        inputs = {key: context[f"{key}_str"] for key in self.BUCKET_TITLES if key != "overview"}
+        inputs["overview"] = (
+            f"总数 {context['total_count']}，已归档 {context['archived_count']}，禁用 {context['disabled_count']}，"
+            f"活跃 {context['active_recent']}，沉寂 {context['inactive_half_yr']}，长期沉寂 {context['inactive_1yr']}"
+        )
+        return inputs
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    def _stream_full(self, df: pd.DataFrame, context: Dict[str, Any], failures: List[str]) -> Iterator[str]:
+        """完整生成报告
+
+        map_reduce 模式（或 auto 模式下项目数超过阈值）先把全部项目按活跃度和语言
+        分片并发总结，再把分片摘要连同统计数据交给最终报告提示词。分部分生成时
+        只有整体评估引用全部摘要，其余部分只带与自己相关的活跃度分组摘要。
+        """
+        context = {**context, "extra_context": "", "bucket_summaries": {}}
+        if self._use_map_reduce(df):
+            grouped = self._map_shards(df)
+            if grouped:
+                # 先在各活跃度分组内合并，分部分生成时每部分只引用自己的分组
+                bucket_summaries = {
+                    bucket: self._reduce_summaries(summaries, bucket) for bucket, summaries in grouped.items()
+                }
+                context["bucket_summaries"] = bucket_summaries
+                context["extra_context"] = (
+                    "【全部项目的分组分析摘要（覆盖所有项目，请在各部分中充分引用）】\n"
+                    + self._reduce_summaries([f"### {b}\n{text}" for b, text in bucket_summaries.items()])
+                )
 
         # 执行分析
-        chain = prompt | self.llm | StrOutputParser()
+        if self.settings.report_parallel_sections:
+            yield from self._stream_sections(context, failures)
+        else:
+            yield from self._report_chain.stream(context)
+
+    def _stream_sections(self, context: Dict[str, Any], failures: List[str]) -> Iterator[str]:
+        """各部分并发生成，按报告顺序产出
+
+        当前部分的内容边生成边产出，后面的部分在后台同时生成并暂存，
+        总耗时接近最慢的一个部分。失败的部分单独重试。
+        """
+        inputs = [
+            {**context, "title": title, "instructions": instructions,
+             "section_data": data.format(**context),
+             "extra_context": self._section_summaries(context, buckets)}
+            for title, data, instructions, buckets in self.SECTIONS
+        ]
+        queues = [queue.Queue() for _ in inputs]
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(inputs), self.settings.llm_concurrency)))
+        try:
+            for item, events in zip(inputs, queues):
+                executor.submit(self._generate_section, item, events, cancelled)
+            for i, ((title, *_), events) in enumerate(zip(self.SECTIONS, queues)):
+                if i:
+                    yield "\n\n"
+                yield from self._drain_section(title, events, failures)
+        finally:
+            # 调用方中途停止读取时，让后台任务尽快结束
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        return chain.invoke({
+    @staticmethod
+    def _section_summaries(context: Dict[str, Any], buckets: Optional[Tuple[str, ...]]) -> str:
+        """某个部分引用的分片摘要：None 表示全部分组的合并摘要"""
+        if buckets is None:
+            return context["extra_context"]
+        bucket_summaries = context.get("bucket_summaries", {})
+        parts = [f"### {bucket}\n{bucket_summaries[bucket]}" for bucket in buckets if bucket in bucket_summaries]
+        if not parts:
+            return ""
+        return "【相关项目的分组分析摘要（覆盖该类全部项目，请充分引用）】\n" + "\n\n".join(parts)
+
+    def _generate_section(self, item: Dict[str, Any], events: queue.Queue, cancelled: threading.Event):
+        """生成一个部分，把 ("chunk" | "retry" | "done" | "error", 值) 事件放入队列"""
+        error = None
+        for attempt in range(self.SECTION_ATTEMPTS):
+            if attempt:
+                time.sleep(attempt)
+                events.put(("retry", None))
+            try:
+                for chunk in self._section_chain.stream(item):
+                    if cancelled.is_set():
+                        return
+                    events.put(("chunk", chunk))
+                events.put(("done", None))
+                return
+            except Exception as e:
+                error = e
+                if cancelled.is_set():
+                    return
+        events.put(("error", error))
+
+    @staticmethod
+    def _drain_section(title: str, events: queue.Queue, failures: List[str]) -> Iterator[str]:
+        """产出一个部分的内容，失败的尝试在产出前就已重试时直接丢弃"""
+        pending = []
+        while True:
+            try:
+                pending.append(events.get_nowait())
+            except queue.Empty:
+                break
+        retries = [i for i, (kind, _) in enumerate(pending) if kind == "retry"]
+        if retries:
+            pending = pending[retries[-1] + 1:]
+
+        emitted = False
+        while True:
+            kind, value = pending.pop(0) if pending else events.get()
+            if kind == "chunk":
+                emitted = True
+                yield value
+            elif kind == "retry":
+                if emitted:
+                    yield "\n\n> ⚠️ 本部分生成中断，以下为重新生成的内容\n\n"
+                    emitted = False
+            elif kind == "done":
+                return
+            else:
+                print(f"\n   ⚠️ 报告部分「{title}」生成失败: {str(value)[:50]}")
+                failures.append(title)
+                heading = "" if emitted else f"## {title}\n\n"
+                yield f"{heading}> ⚠️ 本部分生成失败: {str(value)[:100]}"
+                return
+
+    def _use_map_reduce(self, df: pd.DataFrame) -> bool:
+        """是否启用分片汇总"""
+        mode = self.settings.analysis_mode
+        if mode == "map_reduce":
+            return True
+        return mode == "auto" and len(df) > self.settings.analysis_auto_threshold
+
+    def _shard(self, df: pd.DataFrame) -> List[Tuple[str, List[str]]]:
+        """按活跃度分组后，在每组内按 token 预算切成分片
+
+        同组的小语种依次合并进同一分片，直到接近预算；只有单个语言超出预算时
+        才单独拆分。返回 [(分片名称, 行文本列表)]，同一语言内按 Star 数从高到低排列。
+        """
+        budget = max(200, self.settings.analysis_shard_tokens)
+        df = df.assign(编程语言=df['编程语言'].fillna("Unknown"))
+        assigned = pd.Series(False, index=df.index)
+        shards = []
+        for bucket, condition in self.BUCKETS:
+            mask = condition(df) & ~assigned
+            assigned |= mask
+            subset = df[mask]
+            if subset.empty:
+                continue
+            subset = subset.sort_values(["编程语言", "Star数"], ascending=[True, False])
+            groups = [
+                (language, [self._row_line(row) for _, row in group.iterrows()])
+                for language, group in subset.groupby("编程语言", sort=False)
+            ]
+            for label, lines in self._pack_languages(groups, budget):
+                shards.append((f"{bucket} / {label}", lines))
+        return shards
+
+    @classmethod
+    def _pack_languages(cls, groups: List[Tuple[str, List[str]]], budget: int) -> List[Tuple[str, List[str]]]:
+        """把各语言的行装进不超过预算的分片：小语种合并，超出预算的语言按预算拆开"""
+        packed = []
+        languages, current, used = [], [], 0
+        for language, lines in groups:
+            costs = [estimate_tokens(line) for line in lines]
+            cost = sum(costs)
+            if cost > budget:
+                chunks, chunk, chunk_used = [], [], 0
+                for line, line_cost in zip(lines, costs):
+                    if chunk and chunk_used + line_cost > budget:
+                        chunks.append(chunk)
+                        chunk, chunk_used = [], 0
+                    chunk.append(line)
+                    chunk_used += line_cost
+                chunks.append(chunk)
+                packed.extend((f"{language} ({i}/{len(chunks)})", c) for i, c in enumerate(chunks, 1))
+                continue
+            if current and used + cost > budget:
+                packed.append((cls._languages_label(languages), current))
+                languages, current, used = [], [], 0
+            languages.append(language)
+            current.extend(lines)
+            used += cost
+        if current:
+            packed.append((cls._languages_label(languages), current))
+        return packed
+
+    @staticmethod
+    def _languages_label(languages: List[str]) -> str:
+        """合并分片的名称，语言过多时只列前几种"""
+        if len(languages) <= 3:
+            return "、".join(languages)
+        return f"{'、'.join(languages[:3])} 等 {len(languages)} 种语言"
+
+    @staticmethod
+    def _row_line(row: pd.Series) -> str:
+        """单个项目的紧凑描述"""
+        return (
+            f"- {row['仓库名']} [{row['编程语言']}] ★{row['Star数']} 沉寂{row['沉寂天数']}天 "
+            f"{row['项目标签']} | {str(row['项目描述'])[:120]}"
+        )
+
+    def _map_shards(self, df: pd.DataFrame) -> Dict[str, List[str]]:
+        """并发总结各分片，失败的分片单独重试一次
+
+        返回 {活跃度分组: [分片摘要]}，按分片顺序排列。
+        """
+        shards = self._shard(df)
+        print(f"   - 分片汇总: {len(df)} 个项目分为 {len(shards)} 个分片")
+        inputs = [
+            {"group": name, "count": len(lines), "rows": "\n".join(lines)}
+            for name, lines in shards
+        ]
+        summaries: Dict[int, str] = {}
+        pending = list(range(len(inputs)))
+        for _ in range(2):
+            if not pending:
+                break
+            outputs = self._shard_chain.batch(
+                [inputs[i] for i in pending],
+                config={"max_concurrency": max(1, self.settings.llm_concurrency)},
+                return_exceptions=True
+            )
+            for i, output in zip(pending, outputs):
+                if not isinstance(output, Exception) and output.strip():
+                    summaries[i] = f"### {shards[i][0]}\n{output.strip()}"
+            pending = [i for i in pending if i not in summaries]
+
+        if pending:
+            print(f"   ⚠️ {len(pending)} 个分片汇总失败，报告中将缺少这部分项目")
+        grouped: Dict[str, List[str]] = {}
+        for i in sorted(summaries):
+            grouped.setdefault(shards[i][0].split(" / ", 1)[0], []).append(summaries[i])
+        return grouped
+
+    def _reduce_summaries(self, summaries: List[str], scope: str = "") -> str:
+        """分片摘要超出预算时逐层合并，直到能放进最终报告提示词"""
+        budget = max(200, self.settings.analysis_shard_tokens) * 2
+        while len(summaries) > 1 and estimate_tokens("\n\n".join(summaries)) > budget:
+            groups, current, used = [], [], 0
+            for summary in summaries:
+                cost = estimate_tokens(summary)
+                if current and used + cost > budget:
+                    groups.append(current)
+                    current, used = [], 0
+                current.append(summary)
+                used += cost
+            if current:
+                groups.append(current)
+            if len(groups) == len(summaries):
+                # 单个摘要已接近预算，无法继续合并
+                break
+
+            outputs = self._combine_chain.batch(
+                [{"group": f"{scope}第{i + 1}组", "rows": "\n\n".join(group)} for i, group in enumerate(groups)],
+                config={"max_concurrency": max(1, self.settings.llm_concurrency)},
+                return_exceptions=True
+            )
+            # 合并失败的组保留原摘要，避免丢失内容
+            summaries = [
+                "\n\n".join(group) if isinstance(output, Exception) else output.strip()
+                for group, output in zip(groups, outputs)
+            ]
+        return "\n\n".join(summaries)
+
+    def _build_context(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """构建分析上下文：各类项目数量和重点项目列表"""
+        total_count = len(df)
+
+        # 按状态分类
+        archived_count = len(df[df['仓库状态'].str.contains('已归档', na=False)])
+        disabled_count = len(df[df['仓库状态'].str.contains('已禁用', na=False)])
+
+        # 按更新时间分类
+        active_recent = len(df[(df['沉寂天数'] >= 0) & (df['沉寂天数'] < 180)])
+        inactive_half_yr = len(df[(df['沉寂天数'] >= 180) & (df['沉寂天数'] <= 365)])
+        inactive_1yr = len(df[df['沉寂天数'] > 365])
+
+        # 选取已归档项目 Top 5（高风险）
+        archived_projects = df[df['仓库状态'].str.contains('已归档', na=False)].sort_values("Star数", ascending=False).head(5)
+        archived_str = "\n".join(
+            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  ⚠️ 项目已归档，建议立即制定迁移计划 (Star: {row['Star数']}, Fork: {row['Fork数']})"
+             for _, row in archived_projects.iterrows()]
+        ) if not archived_projects.empty else "无已归档项目"
+
+        # 选取近期活跃项目（<180天）Top 5
+        top_active = df[df['沉寂天数'] < 180].sort_values("关注者数", ascending=False).head(5)
+        active_str = "\n".join(
+            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  更新于{row['最近更新日期']}，更新内容: {row['最近更新内容']} (关注者: {row['关注者数']}, Issues: {row['开放Issues']})"
+             for _, row in top_active.iterrows()]
+        )
+
+        # 选取沉寂半年到一年的项目 Top 5
+        half_yr_projects = df[(df['沉寂天数'] >= 180) & (df['沉寂天数'] <= 365)].sort_values("Star数", ascending=False).head(5)
+        half_yr_str = "\n".join(
+            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  已停更{row['沉寂天数']}天 (Star: {row['Star数']}, 关注者: {row['关注者数']}, Issues: {row['开放Issues']}, 标签: {row['项目标签']})"
+             for _, row in half_yr_projects.iterrows()]
+        )
+
+        # 选取超过一年的项目 Top 5
+        dead_giants = df[df['沉寂天数'] > 365].sort_values("Star数", ascending=False).head(5)
+        dead_str = "\n".join(
+            [f"- [{row['仓库名']}]({row['仓库链接']}) - [{row['编程语言']}] - {row['项目描述']}\n  🚨 已停更{row['沉寂天数']}天 (Star: {row['Star数']}, 关注者: {row['关注者数']}, Fork: {row['Fork数']}, 项目年龄: {row['项目年龄']}, 标签: {row['项目标签']})"
+             for _, row in dead_giants.iterrows()]
+        )
+
+        # Star 数最高的项目的社区数据
+        community_projects = df.nlargest(10, "Star数")
+        community_str = "\n".join(
+            [f"- {row['仓库名']} (Star: {row['Star数']}, 关注者: {row['关注者数']}, 订阅者: {row['订阅者数']}, Fork: {row['Fork数']}, Issues: {row['开放Issues']}, 沉寂{row['沉寂天数']}天)"
+             for _, row in community_projects.iterrows()]
+        )
+
+        # 各分组的输入指纹：数量 + 重点项目
+        fingerprints = {
+            "overview": self._fingerprint([total_count, archived_count, disabled_count,
+                                           active_recent, inactive_half_yr, inactive_1yr]),
+            "archived": self._fingerprint([archived_count, disabled_count, self._row_keys(archived_projects)]),
+            "active": self._fingerprint([active_recent, self._row_keys(top_active)]),
+            "half_yr": self._fingerprint([inactive_half_yr, self._row_keys(half_yr_projects)]),
+            "dead": self._fingerprint([inactive_1yr, self._row_keys(dead_giants)]),
+            "community": self._fingerprint([list(community_projects['仓库名'])]),
+        }
+
+        return {
             "total_count": total_count,
             "archived_count": archived_count,
             "disabled_count": disabled_count,
@@ -148,5 +705,16 @@ class AIAnalyzer:
             "archived_str": archived_str,
             "active_str": active_str,
             "half_yr_str": half_yr_str,
-            "dead_str": dead_str
-        })
+            "dead_str": dead_str,
+            "community_str": community_str,
+            "fingerprints": fingerprints
+        }
+
+    def _row_keys(self, rows: pd.DataFrame) -> List[List[str]]:
+        """重点项目中参与指纹的字段"""
+        columns = [c for c in self.FINGERPRINT_FIELDS if c in rows.columns]
+        return rows[columns].astype(str).values.tolist()
+
+    @staticmethod
+    def _fingerprint(payload: Any) -> str:
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()[:16]
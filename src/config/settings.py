@@ -1,7 +1,7 @@
 """应用配置管理"""
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 from dotenv import load_dotenv
 
 
@@ -13,13 +13,61 @@ class Settings:
     openai_api_key: str
     openai_api_base: str = "https://api.openai.com/v1"
     llm_model_name: str = "gpt-3.5-turbo"
-    request_delay: float = 0.2
+    max_concurrency: int = 8
+    max_retries: int = 4
+    retry_backoff: float = 1.0
+    cache_dir: str = ".cache"
+    http_cache_max_mb: int = 200
+    enrichment_backend: str = "rest"
+    graphql_batch_size: int = 50
+    star_sync: bool = False
+    star_full_sync_days: int = 7
+    stats_pending_timeout: float = 120.0
+    csv_gzip: bool = False
+    csv_chunk_rows: int = 500
+    report_stream: bool = True
+    report_parallel_sections: bool = True
+    report_memo: bool = True
+    report_refresh_days: int = 7
+    readme_max_kb: int = 16
+    enrichment_cache: bool = True
+    enrichment_cache_ttl_days: float = 7.0
+    history_db: str = "history/star_history.sqlite3"
+    github_usernames: List[str] = field(default_factory=list)
+    github_org: Optional[str] = None
+    github_tokens: List[str] = field(default_factory=list)
+    cassette_mode: str = "off"
+    cassette_path: str = "cassettes/run.jsonl.gz"
+    replay_latency: float = 0.0
+    github_api_base: str = "https://api.github.com"
+    summary_batch_tokens: int = 6000
+    summary_batch_size: int = 20
+    llm_concurrency: int = 4
+    llm_rpm: int = 60
+    llm_tpm: int = 100000
+    summary_cache_max_mb: int = 50
+    summary_local_confidence: float = 0.7
+    analysis_mode: str = "single"
+    analysis_shard_tokens: int = 6000
+    analysis_auto_threshold: int = 500
 
     def __post_init__(self):
         """验证配置完整性"""
-        if not all([self.github_token, self.github_username, self.openai_api_key]):
+        has_user = self.github_username or self.github_usernames or self.github_org
+        if not all([self.github_token or self.github_tokens, has_user, self.openai_api_key]):
             raise ValueError("❌ 请在 .env 文件中配置所有必要的环境变量。")
 
+    @property
+    def batch_mode(self) -> bool:
+        """是否为多用户批量模式"""
+        return bool(self.github_usernames or self.github_org)
+
+    @property
+    def all_github_tokens(self) -> List[str]:
+        """所有可用的 GitHub token（去重，主 token 在前）"""
+        tokens = [self.github_token] if self.github_token else []
+        return list(dict.fromkeys(tokens + self.github_tokens))
+
     @classmethod
     def from_env(cls) -> 'Settings':
         """从环境变量创建配置"""
@@ -30,12 +78,54 @@ class Settings:
             openai_api_key=os.getenv("OPENAI_API_KEY"),
             openai_api_base=os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1"),
             llm_model_name=os.getenv("LLM_MODEL_NAME", "gpt-3.5-turbo"),
+            max_concurrency=int(os.getenv("MAX_CONCURRENCY", "8")),
+            max_retries=int(os.getenv("MAX_RETRIES", "4")),
+            retry_backoff=float(os.getenv("RETRY_BACKOFF", "1.0")),
+            cache_dir=os.getenv("CACHE_DIR", ".cache"),
+            http_cache_max_mb=int(os.getenv("HTTP_CACHE_MAX_MB", "200")),
+            enrichment_backend=os.getenv("ENRICHMENT_BACKEND", "rest"),
+            graphql_batch_size=int(os.getenv("GRAPHQL_BATCH_SIZE", "50")),
+            star_sync=os.getenv("STAR_SYNC", "false").lower() in ("1", "true", "yes"),
+            star_full_sync_days=int(os.getenv("STAR_FULL_SYNC_DAYS", "7")),
+            stats_pending_timeout=float(os.getenv("STATS_PENDING_TIMEOUT", "120")),
+            csv_gzip=os.getenv("CSV_GZIP", "false").lower() in ("1", "true", "yes"),
+            csv_chunk_rows=int(os.getenv("CSV_CHUNK_ROWS", "500")),
+            report_stream=os.getenv("REPORT_STREAM", "true").lower() in ("1", "true", "yes"),
+            report_parallel_sections=os.getenv("REPORT_PARALLEL_SECTIONS", "true").lower() in ("1", "true", "yes"),
+            report_memo=os.getenv("REPORT_MEMO", "true").lower() in ("1", "true", "yes"),
+            report_refresh_days=int(os.getenv("REPORT_REFRESH_DAYS", "7")),
+            readme_max_kb=int(os.getenv("README_MAX_KB", "16")),
+            enrichment_cache=os.getenv("ENRICHMENT_CACHE", "true").lower() in ("1", "true", "yes"),
+            enrichment_cache_ttl_days=float(os.getenv("ENRICHMENT_CACHE_TTL_DAYS", "7")),
+            history_db=os.getenv("HISTORY_DB", "history/star_history.sqlite3"),
+            github_usernames=_split_list(os.getenv("GITHUB_USERNAMES", "")),
+            github_org=os.getenv("GITHUB_ORG") or None,
+            github_tokens=_split_list(os.getenv("GITHUB_TOKENS", "")),
+            cassette_mode=os.getenv("CASSETTE_MODE", "off").lower(),
+            cassette_path=os.getenv("CASSETTE_PATH", "cassettes/run.jsonl.gz"),
+            replay_latency=float(os.getenv("REPLAY_LATENCY", "0")),
+            github_api_base=os.getenv("GITHUB_API_BASE", "https://api.github.com").rstrip("/"),
+            summary_batch_tokens=int(os.getenv("SUMMARY_BATCH_TOKENS", "6000")),
+            summary_batch_size=int(os.getenv("SUMMARY_BATCH_SIZE", "20")),
+            llm_concurrency=int(os.getenv("LLM_CONCURRENCY", "4")),
+            llm_rpm=int(os.getenv("LLM_RPM", "60")),
+            llm_tpm=int(os.getenv("LLM_TPM", "100000")),
+            summary_cache_max_mb=int(os.getenv("SUMMARY_CACHE_MAX_MB", "50")),
+            summary_local_confidence=float(os.getenv("SUMMARY_LOCAL_CONFIDENCE", "0.7")),
+            analysis_mode=os.getenv("ANALYSIS_MODE", "single").lower(),
+            analysis_shard_tokens=int(os.getenv("ANALYSIS_SHARD_TOKENS", "6000")),
+            analysis_auto_threshold=int(os.getenv("ANALYSIS_AUTO_THRESHOLD", "500")),
         )
 
     @property
     def github_headers(self) -> dict:
         """GitHub API请求头"""
         return {
-            "Authorization": f"token {self.github_token}",
+            "Authorization": f"token {self.all_github_tokens[0]}",
             "Accept": "application/vnd.github.v3+json"
         }
+
+
+def _split_list(value: str) -> List[str]:
+    """解析逗号分隔的环境变量"""
+    return [item.strip() for item in value.split(",") if item.strip()]
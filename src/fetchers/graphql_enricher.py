@@ -0,0 +1,100 @@
+"""基于 GitHub GraphQL API 的批量仓库信息获取"""
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+from config.settings import Settings
+from fetchers.transport import get_transport
+
+
+class GraphQLEnricher:
+    """一次查询获取多个仓库的年提交数、最新提交信息和 README"""
+
+    # 依次尝试的 README 文件名，都不存在时 readme 为 None，由调用方回退到 REST /readme
+    README_PATHS = ("README.md", "readme.md", "Readme.md", "README.rst", "README")
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.transport = get_transport(settings)
+
+    def fetch_batch(
+        self,
+        commit_repos: List[str],
+        readme_repos: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """批量获取仓库信息
+
+        Args:
+            commit_repos: 需要提交数据的仓库全名
+            readme_repos: 需要 README 的仓库全名
+
+        Returns:
+            以仓库全名为键的结果；查询失败的仓库不会出现在结果中
+        """
+        names = list(dict.fromkeys(commit_repos + readme_repos))
+        if not names:
+            return {}
+
+        aliases = {f"r{i}": name for i, name in enumerate(names)}
+        query = self._build_query(aliases, set(commit_repos), set(readme_repos))
+
+        try:
+            response = self.transport.post(f"{self.settings.github_api_base}/graphql", json={"query": query})
+            response.raise_for_status()
+            data = response.json().get("data") or {}
+        except Exception as e:
+            print(f"   ⚠️ GraphQL 批量查询失败: {str(e)[:80]}")
+            return {}
+
+        results = {}
+        for alias, name in aliases.items():
+            node = data.get(alias)
+            if node is None:
+                continue
+            results[name] = self._parse_node(node, name in commit_repos, name in readme_repos)
+        return results
+
+    def _build_query(self, aliases: Dict[str, str], commit_repos: set, readme_repos: set) -> str:
+        """构建带别名的批量查询"""
+        since = (datetime.now(timezone.utc) - timedelta(days=365)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        parts = []
+        for alias, name in aliases.items():
+            owner, repo = name.split("/", 1)
+            fields = ["pushedAt"]
+            if name in commit_repos:
+                fields.append(
+                    "defaultBranchRef { target { ... on Commit { "
+                    f"message history(since: {json.dumps(since)}) {{ totalCount }} "
+                    "} } }"
+                )
+            if name in readme_repos:
+                for i, path in enumerate(self.README_PATHS):
+                    fields.append(
+                        f"readme{i}: object(expression: {json.dumps('HEAD:' + path)}) "
+                        "{ ... on Blob { text } }"
+                    )
+            parts.append(
+                f"{alias}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) "
+                f"{{ {' '.join(fields)} }}"
+            )
+        return "query {\n" + "\n".join(parts) + "\n}"
+
+    def _parse_node(self, node: Dict[str, Any], want_commits: bool, want_readme: bool) -> Dict[str, Any]:
+        """解析单个仓库的查询结果"""
+        result: Dict[str, Any] = {"pushed_at": node.get("pushedAt")}
+
+        if want_commits:
+            target = (node.get("defaultBranchRef") or {}).get("target") or {}
+            message = target.get("message")
+            result["commits_last_year"] = (target.get("history") or {}).get("totalCount", 0)
+            result["last_msg"] = message.split('\n')[0][:100] if message else "无法获取"
+
+        if want_readme:
+            readme: Optional[str] = None
+            for i in range(len(self.README_PATHS)):
+                blob = node.get(f"readme{i}")
+                if blob and blob.get("text"):
+                    readme = blob["text"]
+                    break
+            result["readme"] = readme
+
+        return result
@@ -0,0 +1,213 @@
+"""HTTP 条件请求缓存（ETag / Last-Modified）"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from config.settings import Settings
+
+# 需要随缓存体一起保存的响应头
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link", "X-Body-Truncated")
+# 响应体被截断时附加的标记头
+TRUNCATED_HEADER = "X-Body-Truncated"
+
+
+class HttpCache:
+    """基于 SQLite 的持久化响应缓存，按 (媒体类型, URL) 索引，正文压缩存储，按 LRU 淘汰"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(url: str, headers: Optional[dict] = None) -> str:
+        """缓存键：同一 URL 的不同媒体类型分开缓存
+
+        ETag 描述的是资源的表示，与发起请求的 token 无关，token 池中的各个 token
+        共用同一条缓存和校验信息。
+        """
+        accept = (headers or {}).get("Accept", "")
+        return f"{accept} {url}"
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """返回用于条件请求的请求头"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def load(self, key: str, url: str) -> Optional[requests.Response]:
+        """从缓存构造响应对象"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(json.loads(row[0]))
+        response._content = zlib.decompress(row[1])
+        response.encoding = "utf-8"
+        response.from_cache = True
+        return response
+
+    def store(self, key: str, response: requests.Response):
+        """保存带校验信息的成功响应"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        headers = {
+            name: response.headers[name]
+            for name in _STORED_HEADERS if name in response.headers
+        }
+        body = zlib.compress(response.content)
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, json.dumps(headers), body, len(body), time.time())
+            )
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """超出容量时按最近最少使用顺序淘汰（调用方需持有锁）"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+
+
+_shared_caches: Dict[str, HttpCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_http_cache(settings: Settings) -> Optional[HttpCache]:
+    """获取进程内共享的缓存实例，未启用时返回 None"""
+    if settings.http_cache_max_mb <= 0:
+        return None
+    path = os.path.join(settings.cache_dir, "http_cache.sqlite3")
+    with _shared_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = HttpCache(path, settings.http_cache_max_mb * 1024 * 1024)
+        return _shared_caches[path]
+
+
+def read_limited(response: requests.Response, max_bytes: int):
+    """只读取响应体的前 max_bytes 字节，超出部分不再下载
+
+    截断时在响应头中加入 X-Body-Truncated: 1。
+    """
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=8192):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            break
+    body = b"".join(chunks)
+    truncated = size > max_bytes
+    response.close()
+    response._content = body[:max_bytes]
+    response._content_consumed = True
+    if truncated:
+        response.headers[TRUNCATED_HEADER] = "1"
+
+
+def cached_get(
+    session: requests.Session,
+    url: str,
+    headers: dict,
+    cache: Optional[HttpCache],
+    max_bytes: Optional[int] = None,
+    **kwargs
+) -> requests.Response:
+    """发起 GET 请求，命中 304 时返回缓存内容
+
+    指定 max_bytes 时以流式读取并只保留前 max_bytes 字节（缓存中保存的也是截断后的内容）。
+    """
+    if max_bytes:
+        kwargs["stream"] = True
+
+    def send(request_headers: dict) -> requests.Response:
+        response = session.get(url, headers=request_headers, **kwargs)
+        if max_bytes:
+            read_limited(response, max_bytes)
+        return response
+
+    if cache is None:
+        return send(headers)
+
+    key = HttpCache.make_key(url, headers)
+    response = send({**headers, **cache.conditional_headers(key)})
+
+    if response.status_code == 304:
+        cached = cache.load(key, url)
+        if cached is not None:
+            # 保留实时的限流信息，供调用方参考
+            for name, value in response.headers.items():
+                if name.lower().startswith("x-ratelimit"):
+                    cached.headers[name] = value
+            return cached
+        # 缓存条目已被淘汰，重新完整请求
+        response = send(headers)
+
+    cache.store(key, response)
+    return response
@@ -0,0 +1,22 @@
+"""获取组织成员列表"""
+from typing import List
+from fetchers.base import BaseFetcher
+from config.settings import Settings
+
+
+class OrgMemberFetcher(BaseFetcher[str]):
+    """获取组织成员的用户名"""
+
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+
+    def fetch(self, org: str) -> List[str]:
+        """按 Link 头逐页获取组织的全部成员"""
+        members = []
+        url = f"{self.settings.github_api_base}/orgs/{org}/members?per_page=100"
+        while url:
+            response = self._request(url)
+            members.extend(member["login"] for member in response.json())
+            url = response.links.get("next", {}).get("url")
+        print(f"   组织 {org} 共 {len(members)} 名成员")
+        return members
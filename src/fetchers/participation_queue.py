@@ -0,0 +1,118 @@
+"""提交统计（stats/participation）的延迟解析队列"""
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.settings import Settings
+from fetchers.repo_stats import RepoStatsFetcher
+
+
+class ParticipationQueue:
+    """先为所有仓库触发统计计算，再在后台按退避间隔重新查询 202 响应
+
+    结果为提交数；超时仍未就绪的记为 UNKNOWN（None），而不是 0。
+    查询在调用方传入的线程池中执行，与其他请求共用 max_concurrency 的在途上限。
+    """
+
+    UNKNOWN = None
+    INITIAL_DELAY = 2.0
+    MAX_DELAY = 30.0
+
+    def __init__(self, stats_fetcher: RepoStatsFetcher, settings: Settings, executor: Executor):
+        self.stats_fetcher = stats_fetcher
+        self.timeout = settings.stats_pending_timeout
+        self._results: Dict[str, Optional[int]] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._pending: List[Tuple[float, str, float]] = []  # (下次查询时间, 仓库名, 下次退避间隔)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._executor = executor
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, repo_full_names: Iterable[str]):
+        """为仓库发出首次统计请求（触发 GitHub 后台计算）"""
+        now = time.time()
+        for name in repo_full_names:
+            with self._cond:
+                if name in self._deadlines:
+                    continue
+                self._deadlines[name] = now + self.timeout
+            self._executor.submit(self._poll, name, self.INITIAL_DELAY)
+
+    def __contains__(self, repo_full_name: str) -> bool:
+        """仓库是否已提交到队列"""
+        with self._cond:
+            return repo_full_name in self._deadlines
+
+    def ready(self, repo_full_names: Iterable[str]) -> bool:
+        """这些仓库的结果是否都已就绪或超时（未提交的仓库视为就绪），不阻塞"""
+        now = time.time()
+        with self._cond:
+            return all(
+                name not in self._deadlines or name in self._results or self._deadlines[name] <= now
+                for name in repo_full_names
+            )
+
+    def result(self, repo_full_name: str) -> Optional[int]:
+        """阻塞等待单个仓库的结果"""
+        with self._cond:
+            if repo_full_name not in self._deadlines:
+                return self.UNKNOWN
+            while repo_full_name not in self._results:
+                remaining = self._deadlines[repo_full_name] - time.time()
+                if remaining <= 0:
+                    self._results[repo_full_name] = self.UNKNOWN
+                    break
+                self._cond.wait(remaining)
+            return self._results[repo_full_name]
+
+    def close(self):
+        """停止后台查询（线程池归调用方所有，不在此关闭）"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _poll(self, name: str, delay: float):
+        """查询一次，仍在计算时按退避间隔重新排队"""
+        with self._cond:
+            if self._closed:
+                return
+        try:
+            value = self.stats_fetcher.try_fetch_commit_activity(name)
+            failed = False
+        except Exception:
+            value, failed = None, True
+        with self._cond:
+            if name in self._results:
+                return
+            if failed:
+                # 请求失败记为未知，不当作 0 次提交
+                self._results[name] = self.UNKNOWN
+            elif value is not None:
+                self._results[name] = value
+            else:
+                next_at = time.time() + delay * random.uniform(0.8, 1.2)
+                if next_at >= self._deadlines[name]:
+                    self._results[name] = self.UNKNOWN
+                else:
+                    heapq.heappush(self._pending, (next_at, name, min(delay * 2, self.MAX_DELAY)))
+            self._cond.notify_all()
+
+    def _run(self):
+        """后台线程：到期后重新提交查询"""
+        with self._cond:
+            while not self._closed:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                next_at, name, delay = self._pending[0]
+                wait = next_at - time.time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._pending)
+                if name not in self._results:
+                    self._executor.submit(self._poll, name, delay)
@@ -0,0 +1,148 @@
+"""基于 GitHub 限流响应头的请求调度器"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import requests
+from config.settings import Settings
+
+
+@dataclass
+class _Bucket:
+    """单个资源类别（core / graphql / search）的令牌桶"""
+    capacity: float
+    tokens: float
+    rate: Optional[float] = None        # 每秒补充的令牌数，None 表示不限速
+    remaining: Optional[int] = None     # 本窗口剩余配额（本地估算）
+    limit: Optional[int] = None         # 每个窗口的总配额
+    reset_at: float = 0.0               # 配额重置时间（epoch 秒）
+    updated_at: float = 0.0
+    announced_reset: float = 0.0        # 已提示过等待的窗口，避免重复输出
+
+    def refill(self, now: float):
+        """按速率补充令牌"""
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        else:
+            self.tokens = self.capacity
+        self.updated_at = now
+
+
+class RateLimitScheduler:
+    """读取 X-RateLimit-* 响应头调度请求
+
+    剩余配额高于保留水位时全速请求，只受并发数限制；低于水位后才把剩余配额
+    均匀分配到重置前的时间内，避免在窗口中途耗尽。
+    """
+
+    RESOURCES = ("core", "graphql", "search")
+    # 保留水位：剩余配额低于总配额的这一比例后开始限速
+    LOW_WATER_RATIO = 0.1
+
+    def __init__(self, burst: int = 8):
+        self._lock = threading.Lock()
+        now = time.time()
+        self._buckets: Dict[str, _Bucket] = {
+            name: _Bucket(capacity=float(burst), tokens=float(burst), updated_at=now)
+            for name in self.RESOURCES
+        }
+
+    @staticmethod
+    def resource_for(url: str) -> str:
+        """根据请求地址判断所属的限流资源"""
+        if url.rstrip("/").endswith("/graphql"):
+            return "graphql"
+        if "/search/" in url:
+            return "search"
+        return "core"
+
+    def acquire(self, resource: str = "core"):
+        """获取一次请求许可，必要时阻塞等待"""
+        bucket = self._buckets.get(resource, self._buckets["core"])
+        while True:
+            with self._lock:
+                now = time.time()
+                if bucket.remaining is not None and bucket.remaining <= 0:
+                    if now >= bucket.reset_at:
+                        # 窗口已重置，等待下一个响应重新校准
+                        bucket.remaining = None
+                        bucket.rate = None
+                        bucket.tokens = bucket.capacity
+                        continue
+                    wait = bucket.reset_at - now + 1
+                    self._announce_wait(resource, bucket, wait)
+                    wait = min(wait, 5.0)
+                else:
+                    bucket.refill(now)
+                    if bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        if bucket.remaining is not None:
+                            bucket.remaining -= 1
+                        return
+                    wait = (1 - bucket.tokens) / bucket.rate
+            time.sleep(wait)
+
+    def update(self, response: requests.Response, resource: Optional[str] = None):
+        """根据响应头校准配额"""
+        headers = response.headers
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_at = float(headers.get("X-RateLimit-Reset", 0))
+            limit = int(headers["X-RateLimit-Limit"]) if "X-RateLimit-Limit" in headers else None
+        except ValueError:
+            return
+
+        resource = headers.get("X-RateLimit-Resource") or resource or "core"
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            return
+
+        with self._lock:
+            now = time.time()
+            bucket.refill(now)
+            if bucket.remaining is None or reset_at > bucket.reset_at:
+                # 新的配额窗口，以服务端数据为准
+                bucket.remaining = remaining
+            else:
+                # 同一窗口内并发请求的响应可能过时，取较小值
+                bucket.remaining = min(bucket.remaining, remaining)
+            bucket.reset_at = reset_at
+            bucket.limit = limit or bucket.limit or bucket.remaining
+            if bucket.remaining > bucket.limit * self.LOW_WATER_RATIO:
+                # 配额充足时不限速
+                bucket.rate = None
+            else:
+                window = max(1.0, reset_at - now)
+                bucket.rate = max(bucket.remaining, 0) / window
+
+    def headroom(self, resource: str = "core") -> Tuple[Optional[int], float]:
+        """返回 (剩余配额估算, 重置时间)，尚未观测到限流信息时剩余配额为 None"""
+        bucket = self._buckets.get(resource, self._buckets["core"])
+        with self._lock:
+            if bucket.remaining is not None and time.time() >= bucket.reset_at:
+                return None, bucket.reset_at
+            return bucket.remaining, bucket.reset_at
+
+    @staticmethod
+    def _announce_wait(resource: str, bucket: _Bucket, wait: float):
+        """配额耗尽时提示一次（调用方需持有锁）"""
+        if bucket.announced_reset != bucket.reset_at:
+            bucket.announced_reset = bucket.reset_at
+            print(f"   ⏳ GitHub {resource} 配额已用尽，{wait:.0f}s 后重置，暂停请求...")
+
+
+_shared_schedulers: Dict[str, RateLimitScheduler] = {}
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter(settings: Settings, token: Optional[str] = None) -> RateLimitScheduler:
+    """获取进程内共享的调度器（同一 token 共用一份配额）"""
+    token = token or settings.github_token
+    with _shared_lock:
+        if token not in _shared_schedulers:
+            _shared_schedulers[token] = RateLimitScheduler(
+                burst=max(1, settings.max_concurrency)
+            )
+        return _shared_schedulers[token]
@@ -1,112 +1,288 @@
 """README提取和总结"""
-import base64
+import codecs
+import json
+import os
 import time
-import requests
-from typing import Optional
-from langchain_openai import ChatOpenAI
+from typing import Any, Dict, List, Optional, Set
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from config.settings import Settings
+from fetchers.transport import get_transport
+from fetchers.http_cache import TRUNCATED_HEADER
+from processors.readme_summarizer import ReadmeSummarizer
+from storage.summary_cache import SummaryCache
+from utils.llm import estimate_tokens, throttled_chat_model
 
 
 class ReadmeExtractor:
     """README提取器"""
 
+    # 直接返回 README 原文，省去 JSON 包装和 base64 解码
+    RAW_MEDIA_TYPE = "application/vnd.github.raw"
+    # UTF-8 之外依次尝试的编码
+    FALLBACK_ENCODINGS = ("gb18030", "big5", "shift_jis")
+    # 每个README送入LLM的字符数
+    SUMMARY_CHARS = 1500
+    # 批量总结的最多轮数（每轮只重试上一轮缺失的条目）
+    SUMMARY_ROUNDS = 3
+    # 批量总结中每个仓库预留的输出 token 数（50 字总结 + JSON 键名和引号）
+    BATCH_ITEM_OUTPUT_TOKENS = 80
+    # 批量提示词中每个仓库的标记，用于统计批次大小
+    BATCH_ITEM_MARKER = "### 仓库: "
+    # 提示词版本，修改提示词或截取长度后需递增，使总结缓存失效
+    PROMPT_VERSION = "1"
+
+    SUMMARY_PROMPT = """
+        请阅读以下GitHub项目的README内容，用1-2句话总结这个项目的主要用途和功能。
+        要求：
+        1. 语言简洁明了，突出项目核心功能
+        2. 字数控制在50字以内
+        3. 直接说明项目是什么/做什么，不需要说明如何使用
+
+        README内容：
+        {summary_text}
+
+        总结：
+        """
+
+    BATCH_PROMPT = """
+        请阅读以下{count}个GitHub项目的README内容，分别用1-2句话总结每个项目的主要用途和功能。
+        要求：
+        1. 语言简洁明了，突出项目核心功能
+        2. 每个总结的字数控制在50字以内
+        3. 直接说明项目是什么/做什么，不需要说明如何使用
+        4. 只输出一个JSON对象，键为"仓库:"后面的仓库名（原样保留），值为对应的总结，不要输出其他内容
+
+        {readmes}
+        """
+
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.session = requests.Session()
+        self.transport = get_transport(settings)
+        self.local_summarizer = ReadmeSummarizer()
+
+        self.summary_cache = None
+        if settings.summary_cache_max_mb > 0:
+            self.summary_cache = SummaryCache(
+                os.path.join(settings.cache_dir, "summaries.sqlite3"),
+                settings.summary_cache_max_mb * 1024 * 1024
+            )
+
+        # 整个运行共用一个模型客户端和限流器，链只构建一次
+        summary_llm = throttled_chat_model(settings, temperature=0.3)
+        # 批量请求的输出随批次大小增长，按本批仓库数预留，避免 TPM 限流低估
+        batch_llm = throttled_chat_model(settings, temperature=0.3, max_output_tokens=self._batch_output_tokens)
+        self._summary_chain = PromptTemplate.from_template(self.SUMMARY_PROMPT) | summary_llm | StrOutputParser()
+        self._batch_chain = PromptTemplate.from_template(self.BATCH_PROMPT) | batch_llm | StrOutputParser()
 
     def extract(self, repo_full_name: str) -> str:
         """提取README内容并总结"""
-        url = f"https://api.github.com/repos/{repo_full_name}/readme"
+        return self.summarize(self.fetch_text(repo_full_name))
+
+    def fetch_text(self, repo_full_name: str) -> str:
+        """下载并解码README开头部分，获取失败时返回空字符串"""
+        url = f"{self.settings.github_api_base}/repos/{repo_full_name}/readme"
 
         try:
-            response = self.session.get(
+            # 只下载开头部分，总结只需要前面的内容
+            response = self.transport.get(
                 url,
-                headers=self.settings.github_headers
+                headers={"Accept": self.RAW_MEDIA_TYPE},
+                max_bytes=self.settings.readme_max_kb * 1024
             )
 
             if response.status_code == 200:
-                readme_content = base64.b64decode(response.json()['content']).decode('utf-8')
+                truncated = response.headers.get(TRUNCATED_HEADER) == "1"
+                return self._decode(response.content, truncated)
 
-                # 使用LLM总结
-                return self._summarize_with_llm(readme_content)
+        except Exception:
+            pass
+
+        return ""
 
-        except Exception as e:
+    def _decode(self, data: bytes, truncated: bool) -> str:
+        """解码 README 字节
+
+        截断处可能切断多字节字符，UTF-8 使用增量解码器丢弃末尾不完整的序列；
+        非 UTF-8 的 README 依次尝试常见编码，最后以替换字符兜底。
+        """
+        if data.startswith(codecs.BOM_UTF8):
+            data = data[len(codecs.BOM_UTF8):]
+        elif data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return self._decode_with("utf-16", data, truncated, errors="replace")
+
+        try:
+            return self._decode_with("utf-8", data, truncated)
+        except UnicodeDecodeError:
             pass
 
-        return "无描述"
+        for encoding in self.FALLBACK_ENCODINGS:
+            try:
+                return self._decode_with(encoding, data, truncated)
+            except UnicodeDecodeError:
+                continue
 
-    def _summarize_with_llm(self, readme_content: str) -> str:
-        """使用LLM总结README"""
-        # 提取前1500个字符作为参考文本
-        summary_text = readme_content[:1500]
+        return self._decode_with("utf-8", data, truncated, errors="replace")
 
-        # 构建总结提示模板
-        summary_prompt_template = """
-        请阅读以下GitHub项目的README内容，用1-2句话总结这个项目的主要用途和功能。
-        要求：
-        1. 语言简洁明了，突出项目核心功能
-        2. 字数控制在50字以内
-        3. 直接说明项目是什么/做什么，不需要说明如何使用
+    @staticmethod
+    def _decode_with(encoding: str, data: bytes, truncated: bool, errors: str = "strict") -> str:
+        """用增量解码器解码，截断时不要求末尾字符完整"""
+        decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+        return decoder.decode(data, final=not truncated)
 
-        README内容：
-        {summary_text}
+    def summarize(self, readme_content: str) -> str:
+        """总结已获取的README内容，本地抽取置信度足够高时不调用LLM"""
+        if not readme_content:
+            return "无描述"
+        summary, confidence = self.local_summarizer.summarize(readme_content)
+        if confidence >= self.settings.summary_local_confidence:
+            return summary
+        return self._summarize_with_llm(readme_content)
 
-        总结：
-        """
+    def _summarize_with_llm(self, readme_content: str) -> str:
+        """使用LLM总结README"""
+        # 提取前1500个字符作为参考文本
+        summary_text = readme_content[:self.SUMMARY_CHARS]
+        key = self._cache_key(summary_text)
+        if self.summary_cache is not None:
+            cached = self.summary_cache.get_many([key])
+            if key in cached:
+                return cached[key]
 
         try:
-            # 配置简化的LLM用于总结
-            summary_llm = ChatOpenAI(
-                model_name=self.settings.llm_model_name,
-                temperature=0.3,
-                openai_api_key=self.settings.openai_api_key,
-                openai_api_base=self.settings.openai_api_base
-            )
-
-            prompt = PromptTemplate.from_template(summary_prompt_template)
-            chain = prompt | summary_llm | StrOutputParser()
-            result = chain.invoke({"summary_text": summary_text})
+            result = self._summary_chain.invoke({"summary_text": summary_text})
 
             if result and len(result.strip()) > 5:
+                if self.summary_cache is not None:
+                    self.summary_cache.put_many([(key, result.strip())])
                 return result.strip()
             return "无描述"
 
         except Exception as llm_error:
             print(f"   ⚠️ LLM总结失败: {str(llm_error)[:50]}")
-            # 如果LLM失败，回退到简单提取
-            return self._simple_extract(summary_text)
-
-    def _simple_extract(self, readme_content: str) -> str:
-        """简单的README提取（作为LLM的备用方案）"""
-        lines = readme_content.split('\n')[:30]
-        title_lines = []
-        description_lines = []
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith('#'):
-                title_lines.append(line.lstrip('#').strip())
-            elif len(line) > 30 and not line.startswith('!['):
-                description_lines.append(line)
-
-        result_parts = []
-
-        if title_lines:
-            main_title = title_lines[0]
-            if len(main_title) < 100:
-                result_parts.append(main_title)
-
-        for desc in description_lines[:3]:
-            if 20 < len(desc) < 150:
-                result_parts.append(desc)
+            # 如果LLM失败，回退到本地抽取
+            return self._local_fallback(readme_content)
+
+    def summarize_many(self, readmes: Dict[str, str], fallbacks: Optional[Set[str]] = None) -> Dict[str, str]:
+        """批量总结多个README，返回 {仓库名: 总结}
+
+        本地抽取置信度足够高的README直接使用抽取结果；其余按 token 预算打包进
+        一次LLM请求，要求以仓库名为键返回JSON，缺失或格式不对的条目单独重试，
+        多轮后仍失败的回退到本地抽取。内容与之前总结过的README相同时直接使用总结缓存。
+        fallbacks 不为 None 时写入没有得到可靠总结的仓库（README为空或LLM失败后的回退），
+        调用方不应长期缓存这些结果。
+        """
+        fallbacks = fallbacks if fallbacks is not None else set()
+        results = {name: "无描述" for name, text in readmes.items() if not text}
+        fallbacks.update(results)
+        pending = {}
+        local_count = 0
+        for name, text in readmes.items():
+            if not text:
+                continue
+            summary, confidence = self.local_summarizer.summarize(text)
+            if confidence >= self.settings.summary_local_confidence:
+                results[name] = summary
+                local_count += 1
+            else:
+                pending[name] = text[:self.SUMMARY_CHARS]
+        if local_count:
+            print(f"   - {local_count} 个README简介清晰，本地提取总结")
+        keys = {name: self._cache_key(text) for name, text in pending.items()}
+
+        if self.summary_cache is not None and pending:
+            cached = self.summary_cache.get_many(keys.values())
+            hits = [name for name in pending if keys[name] in cached]
+            for name in hits:
+                results[name] = cached[keys[name]]
+                del pending[name]
+            if hits:
+                print(f"   - {len(hits)} 个README内容未变，复用已有总结")
+
+        fresh = {}
+        for _ in range(self.SUMMARY_ROUNDS):
+            if not pending:
                 break
+            for name, summary in self._summarize_batches(self._pack_batches(pending)).items():
+                results[name] = fresh[name] = summary
+                pending.pop(name, None)
+
+        # 只缓存LLM生成的总结，回退结果下次仍会重试
+        if self.summary_cache is not None and fresh:
+            self.summary_cache.put_many((keys[name], summary) for name, summary in fresh.items())
 
-        if result_parts:
-            result = ' | '.join(result_parts)
-            if len(result) > 200:
-                result = result[:200] + "..."
-            return result
+        for name in pending:
+            results[name] = self._local_fallback(readmes[name])
+        fallbacks.update(pending)
+        return results
+
+    def _cache_key(self, text: str) -> str:
+        """总结缓存键"""
+        return SummaryCache.make_key(text, self.settings.llm_model_name, self.PROMPT_VERSION)
+
+    def _pack_batches(self, texts: Dict[str, str]) -> List[Dict[str, str]]:
+        """按 token 预算和条数上限分批"""
+        budget = max(1, self.settings.summary_batch_tokens)
+        max_items = max(1, self.settings.summary_batch_size)
+        batches: List[Dict[str, str]] = []
+        current: Dict[str, str] = {}
+        used = 0
+        for name, text in texts.items():
+            cost = estimate_tokens(text) + estimate_tokens(name) + 10
+            if current and (used + cost > budget or len(current) >= max_items):
+                batches.append(current)
+                current, used = {}, 0
+            current[name] = text
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _summarize_batches(self, batches: List[Dict[str, str]]) -> Dict[str, str]:
+        """并发请求各批总结，只返回解析成功的条目"""
+        inputs = [
+            {
+                "readmes": "\n\n".join(f"{self.BATCH_ITEM_MARKER}{name}\n{text}" for name, text in batch.items()),
+                "count": len(batch),
+            }
+            for batch in batches
+        ]
+        outputs = self._batch_chain.batch(
+            inputs,
+            config={"max_concurrency": max(1, self.settings.llm_concurrency)},
+            return_exceptions=True
+        )
+
+        results = {}
+        for batch, output in zip(batches, outputs):
+            if isinstance(output, Exception):
+                print(f"   ⚠️ LLM批量总结失败 ({len(batch)} 个): {str(output)[:50]}")
+                continue
+            parsed = self._parse_json_object(output)
+            for name in batch:
+                summary = parsed.get(name)
+                if isinstance(summary, str) and len(summary.strip()) > 5:
+                    results[name] = summary.strip()
+        return results
+
+    @classmethod
+    def _batch_output_tokens(cls, prompt: str) -> int:
+        """批量总结的输出预留：按提示词中的仓库数线性增长"""
+        return cls.BATCH_ITEM_OUTPUT_TOKENS * max(1, prompt.count(cls.BATCH_ITEM_MARKER))
+
+    @staticmethod
+    def _parse_json_object(output: str) -> Dict[str, Any]:
+        """从模型输出中解析JSON对象（容忍代码块包裹和前后多余文字）"""
+        start, end = output.find("{"), output.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            data = json.loads(output[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        return data if isinstance(data, dict) else {}
 
-        return "无描述"
+    def _local_fallback(self, readme_content: str) -> str:
+        """LLM不可用时使用本地抽取结果，不论置信度高低"""
+        summary, _ = self.local_summarizer.summarize(readme_content)
+        return summary or "无描述"
@@ -1,6 +1,7 @@
 """获取仓库统计数据"""
-import requests
+from typing import Optional
 from config.settings import Settings
+from fetchers.transport import get_transport
 
 
 class RepoStatsFetcher:
@@ -8,32 +9,34 @@ class RepoStatsFetcher:
 
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.session = requests.Session()
-
-    def _request(self, url: str) -> requests.Response:
-        """发起HTTP请求"""
-        response = self.session.get(url, headers=self.settings.github_headers)
-        response.raise_for_status()
-        return response
+        self.transport = get_transport(settings)
 
     def fetch_commit_activity(self, repo_full_name: str) -> int:
-        """获取过去一年的提交统计"""
-        url = f"https://api.github.com/repos/{repo_full_name}/stats/participation"
+        """获取过去一年的提交统计，未就绪或失败时返回 0"""
         try:
-            response = self._request(url)
-            if response.status_code == 200:
-                data = response.json()
-                if 'all' in data:
-                    return sum(data['all'])
-        except:
-            pass
-        return 0
+            return self.try_fetch_commit_activity(repo_full_name) or 0
+        except Exception:
+            return 0
+
+    def try_fetch_commit_activity(self, repo_full_name: str) -> Optional[int]:
+        """获取过去一年的提交统计
+
+        GitHub 仍在计算（202）时返回 None；请求失败或返回内容异常时抛出异常，
+        调用方应记为未知，而不是 0 次提交。
+        """
+        url = f"{self.settings.github_api_base}/repos/{repo_full_name}/stats/participation"
+        response = self.transport.get(url)
+        response.raise_for_status()
+        if response.status_code == 202:
+            return None
+        return sum(response.json()['all'])
 
     def fetch_latest_commit(self, repo_full_name: str, branch: str = "main") -> str:
         """获取最新提交信息"""
-        url = f"https://api.github.com/repos/{repo_full_name}/commits/{branch}"
+        url = f"{self.settings.github_api_base}/repos/{repo_full_name}/commits/{branch}"
         try:
-            response = self._request(url)
+            response = self.transport.get(url)
+            response.raise_for_status()
             if response.status_code == 200:
                 msg = response.json()['commit']['message']
                 return msg.split('\n')[0][:100]
@@ -1,41 +1,202 @@
 """获取用户starred仓库列表"""
-from typing import List
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Iterator
+from urllib.parse import urlparse, parse_qs
+import requests
 from fetchers.base import BaseFetcher
 from models.repository import Repository
 from config.settings import Settings
-import time
+from storage.star_state import StarState, StarStateStore
 
 
 class StarredRepoFetcher(BaseFetcher[Repository]):
     """获取用户starred仓库"""
 
-    def __init__(self, settings: Settings):
+    PER_PAGE = 100
+    # 携带 starred_at 字段的媒体类型
+    STAR_MEDIA_TYPE = "application/vnd.github.star+json"
+
+    def __init__(self, settings: Settings, username: Optional[str] = None):
         super().__init__(settings)
+        self.username = username or settings.github_username
+        self.state_store = StarStateStore(
+            os.path.join(settings.cache_dir, f"stars_{self.username}.json")
+        )
 
     def fetch(self) -> List[Repository]:
         """获取所有starred仓库"""
-        repos = []
+        print(f"📡 开始获取用户 {self.username} 的 Star 列表...")
+        return self._fetch_all()
+
+    def sync(self) -> List[Repository]:
+        """增量同步starred仓库
+
+        按 Star 时间从新到旧拉取，遇到上次已知的仓库即停止；再按最近推送时间
+        从新到旧刷新有新推送的已知仓库，使沉寂天数和丰富化缓存键保持最新。
+        每隔 star_full_sync_days 天做一次全量校对，为取消的 Star 写入墓碑记录，
+        同时刷新所有仓库的 Star 数、归档状态等不随推送变化的字段。
+        仓库列表保存在本地状态文件中。
+        """
+        state = self.state_store.load()
+        now = datetime.now(timezone.utc)
+
+        try:
+            if self._full_sync_due(state, now):
+                print(f"📡 全量同步用户 {self.username} 的 Star 列表...")
+                repos = self._fetch_all(self.STAR_MEDIA_TYPE)
+                self._reconcile(state, repos, now)
+                state.last_full_sync = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+            else:
+                print(f"📡 增量同步用户 {self.username} 的 Star 列表...")
+                new_repos = self._fetch_new(state)
+                state.repos = new_repos + state.repos
+                for repo in new_repos:
+                    state.tombstones.pop(repo.full_name, None)
+                refreshed = self._refresh_pushed(state, {repo.full_name for repo in new_repos})
+                print(f"   新增 {len(new_repos)} 个 Star，{refreshed} 个已知仓库有新推送，累计 {len(state.repos)} 个")
+        except Exception as e:
+            # 请求失败时保留原状态，避免把未取到的仓库误判为取消 Star
+            print(f"❌ API 请求失败，沿用上次同步的 {len(state.repos)} 个仓库: {e}")
+            return state.repos
+
+        self.state_store.save(state)
+        return state.repos
+
+    def _full_sync_due(self, state: StarState, now: datetime) -> bool:
+        """是否需要全量校对"""
+        if not state.repos or not state.last_full_sync:
+            return True
+        last = datetime.strptime(state.last_full_sync, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        return now - last >= timedelta(days=self.settings.star_full_sync_days)
+
+    def _fetch_new(self, state: StarState) -> List[Repository]:
+        """从最新的 Star 开始逐页拉取，直到遇到已知仓库"""
+        known = {repo.full_name for repo in state.repos}
+        new_repos = []
         page = 1
-        print(f"📡 开始获取用户 {self.settings.github_username} 的 Star 列表...")
+        while True:
+            response = self._request(
+                self._page_url(page), headers={"Accept": self.STAR_MEDIA_TYPE}
+            )
+            for repo in self._parse_page(response.json()):
+                if repo.full_name in known:
+                    return new_repos
+                new_repos.append(repo)
+            if page >= self._last_page(response):
+                return new_repos
+            page += 1
 
+    def _refresh_pushed(self, state: StarState, skip: set) -> int:
+        """按最近推送时间从新到旧刷新已知仓库，遇到推送时间未变的仓库即停止
+
+        之后的仓库推送时间都更早，不可能在上次同步后有新推送。返回刷新的仓库数。
+        """
+        index = {repo.full_name: i for i, repo in enumerate(state.repos)}
+        refreshed = 0
+        page = 1
         while True:
-            url = f"https://api.github.com/users/{self.settings.github_username}/starred?per_page=100&page={page}"
-            try:
-                response = self._request(url)
-                data = response.json()
+            response = self._request(
+                self._page_url(page, sort="updated"), headers={"Accept": self.STAR_MEDIA_TYPE}
+            )
+            for repo in self._parse_page(response.json()):
+                if repo.full_name in skip or repo.full_name not in index:
+                    continue
+                stored = state.repos[index[repo.full_name]]
+                if stored.pushed_at == repo.pushed_at:
+                    return refreshed
+                state.repos[index[repo.full_name]] = repo
+                refreshed += 1
+            if page >= self._last_page(response):
+                return refreshed
+            page += 1
 
-                if not data:
-                    break
+    @staticmethod
+    def _reconcile(state: StarState, repos: List[Repository], now: datetime):
+        """用全量结果替换状态，并为消失的仓库写入墓碑"""
+        current = {repo.full_name for repo in repos}
+        unstarred_at = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        removed = [repo.full_name for repo in state.repos if repo.full_name not in current]
+        for name in removed:
+            state.tombstones[name] = unstarred_at
+        for name in current:
+            state.tombstones.pop(name, None)
+        if removed:
+            print(f"   发现 {len(removed)} 个已取消的 Star")
+        state.repos = repos
 
-                for repo_data in data:
-                    repos.append(Repository.from_github_api(repo_data))
+    def iter_pages(self, accept: Optional[str] = None) -> Iterator[List[Repository]]:
+        """按页码顺序逐页产出仓库
 
-                print(f"   已加载第 {page} 页，累计 {len(repos)} 个...")
-                page += 1
-                time.sleep(self.settings.request_delay)
+        先请求第 1 页，从 Link 头的 rel="last" 读出总页数；其余页面在后台
+        并发预取（最多 max_concurrency 页在途），调用方处理当前页时下载不中断。
+        瞬时错误由传输层重试；重试用尽仍失败时抛出异常，不返回残缺列表。
+        """
+        headers = {"Accept": accept} if accept else None
 
-            except Exception as e:
-                print(f"❌ API 请求失败: {e}")
-                break
+        response = self._request(self._page_url(1), headers=headers)
+        first_page = self._parse_page(response.json())
+        last_page = self._last_page(response)
+        loaded = len(first_page)
+        print(f"   已加载第 1/{last_page} 页，累计 {loaded} 个...")
 
+        if last_page <= 1:
+            yield first_page
+            return
+
+        window = max(1, self.settings.max_concurrency)
+        next_page = 2
+        with ThreadPoolExecutor(max_workers=min(window, last_page - 1)) as executor:
+            in_flight = deque()
+
+            def top_up():
+                nonlocal next_page
+                while next_page <= last_page and len(in_flight) < window:
+                    in_flight.append((next_page, executor.submit(self._fetch_page, next_page, headers)))
+                    next_page += 1
+
+            # 先提交后续页面再交出第 1 页，使下载与下游处理重叠
+            top_up()
+            yield first_page
+
+            while in_flight:
+                page, future = in_flight.popleft()
+                repos = self._parse_page(future.result())
+                top_up()
+                loaded += len(repos)
+                print(f"   已加载第 {page}/{last_page} 页，累计 {loaded} 个...")
+                yield repos
+
+    def _fetch_all(self, accept: Optional[str] = None) -> List[Repository]:
+        """获取全部页面并按页码顺序合并"""
+        repos = []
+        for page in self.iter_pages(accept):
+            repos.extend(page)
         return repos
+
+    def _page_url(self, page: int, sort: str = "created") -> str:
+        """构建分页请求地址，sort 为 created（Star 时间）或 updated（最近推送时间）"""
+        return (
+            f"{self.settings.github_api_base}/users/{self.username}/starred"
+            f"?per_page={self.PER_PAGE}&sort={sort}&direction=desc&page={page}"
+        )
+
+    def _fetch_page(self, page: int, headers: Optional[dict] = None) -> List[Dict[str, Any]]:
+        """获取单页原始数据"""
+        return self._request(self._page_url(page), headers=headers).json()
+
+    @staticmethod
+    def _parse_page(data: List[Dict[str, Any]]) -> List[Repository]:
+        """解析单页数据"""
+        return [Repository.from_github_api(repo_data) for repo_data in data]
+
+    @staticmethod
+    def _last_page(response: requests.Response) -> int:
+        """从 Link 头读取总页数，没有分页时返回 1"""
+        last_url = response.links.get("last", {}).get("url")
+        if not last_url:
+            return 1
+        page = parse_qs(urlparse(last_url).query).get("page", ["1"])[0]
+        return int(page) if page.isdigit() else 1
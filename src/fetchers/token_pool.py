@@ -0,0 +1,97 @@
+"""GitHub token 池"""
+import threading
+import time
+from typing import Dict, List, Optional
+import requests
+from config.settings import Settings
+from fetchers.rate_limiter import RateLimitScheduler, get_rate_limiter
+
+
+class NoUsableTokenError(RuntimeError):
+    """所有 token 均已失效"""
+
+
+class TokenPool:
+    """在多个 token 之间分配请求
+
+    每个 token 各有一个限流调度器，记录剩余配额和重置时间。
+    每次请求选择剩余配额最多的 token；配额耗尽的 token 在重置前不再参与轮换，
+    返回 401 的 token（已吊销或无效）永久移出。
+    """
+
+    def __init__(self, tokens: List[str], schedulers: Dict[str, RateLimitScheduler]):
+        if not tokens:
+            raise ValueError("❌ 至少需要配置一个 GitHub token")
+        self.tokens = list(dict.fromkeys(tokens))
+        self._schedulers = schedulers
+        self._revoked: set = set()
+        self._uses: Dict[str, int] = {token: 0 for token in self.tokens}
+        self._lock = threading.Lock()
+
+    def acquire(self, resource: str = "core") -> str:
+        """选出 token 并等待其调度许可，返回选中的 token"""
+        token = self._choose(resource)
+        self._schedulers[token].acquire(resource)
+        return token
+
+    def update(self, token: str, response: requests.Response, resource: Optional[str] = None):
+        """根据响应更新 token 状态"""
+        if response.status_code == 401:
+            self._revoke(token)
+            return
+        self._schedulers[token].update(response, resource)
+
+    @property
+    def active_count(self) -> int:
+        """仍可用的 token 数"""
+        with self._lock:
+            return len(self.tokens) - len(self._revoked)
+
+    def _choose(self, resource: str) -> str:
+        """选择剩余配额最多的 token；全部耗尽时选最早重置的"""
+        now = time.time()
+        with self._lock:
+            candidates = [token for token in self.tokens if token not in self._revoked]
+            if not candidates:
+                raise NoUsableTokenError("❌ 所有 GitHub token 均已失效，请检查配置")
+
+            available = []
+            soonest, soonest_reset = candidates[0], float("inf")
+            for token in candidates:
+                remaining, reset_at = self._schedulers[token].headroom(resource)
+                if remaining is not None and remaining <= 0 and reset_at > now:
+                    if reset_at < soonest_reset:
+                        soonest, soonest_reset = token, reset_at
+                    continue
+                # 尚未观测过的 token 视为配额充足
+                score = float("inf") if remaining is None else remaining
+                available.append((score, -self._uses[token], token))
+
+            token = max(available)[2] if available else soonest
+            self._uses[token] += 1
+            return token
+
+    def _revoke(self, token: str):
+        """移出失效的 token"""
+        with self._lock:
+            if token in self._revoked:
+                return
+            self._revoked.add(token)
+            remaining = len(self.tokens) - len(self._revoked)
+        print(f"   ⚠️ GitHub token ...{token[-4:]} 认证失败，已移出轮换（剩余 {remaining} 个）")
+
+
+_shared_pools: Dict[tuple, TokenPool] = {}
+_shared_lock = threading.Lock()
+
+
+def get_token_pool(settings: Settings) -> TokenPool:
+    """获取进程内共享的 token 池"""
+    tokens = settings.all_github_tokens
+    key = tuple(tokens)
+    with _shared_lock:
+        if key not in _shared_pools:
+            _shared_pools[key] = TokenPool(
+                tokens, {token: get_rate_limiter(settings, token) for token in tokens}
+            )
+        return _shared_pools[key]
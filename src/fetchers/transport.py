@@ -0,0 +1,168 @@
+"""所有获取器共用的 GitHub HTTP 传输层"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import Settings
+from fetchers.http_cache import get_http_cache, cached_get
+from fetchers.rate_limiter import RateLimitScheduler
+from fetchers.token_pool import get_token_pool
+from utils.cassette import CassetteAdapter, get_cassette
+
+
+class GitHubTransport:
+    """共享连接池的 HTTP 客户端
+
+    - 连接池大小随并发数配置
+    - keep-alive + gzip
+    - 指数退避（带抖动）重试，遵循 Retry-After
+    - 按端点设置超时
+    - 接入条件请求缓存和 token 池（每个 token 独立限流）
+    - 可选录制 / 回放（CASSETTE_MODE）
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    MAX_BACKOFF = 60.0
+    # 按地址片段匹配的 (连接超时, 读取超时)，按顺序取第一个匹配
+    ENDPOINT_TIMEOUTS: Tuple[Tuple[str, Tuple[float, float]], ...] = (
+        ("/graphql", (5.0, 60.0)),
+        ("/stats/", (5.0, 30.0)),
+        ("/starred", (5.0, 30.0)),
+        ("/readme", (5.0, 20.0)),
+        ("/commits/", (5.0, 15.0)),
+    )
+    DEFAULT_TIMEOUT = (5.0, 20.0)
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        cassette = get_cassette(settings)
+        # 录制 / 回放时不使用条件请求缓存，保证两次运行发出相同的请求
+        self.http_cache = None if cassette else get_http_cache(settings)
+        self.token_pool = get_token_pool(settings)
+
+        # 主处理线程池、统计队列和分页抓取会同时占用连接，预留余量
+        pool_size = max(10, settings.max_concurrency * 2)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        if cassette:
+            adapter = CassetteAdapter(cassette, adapter)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+    def get(self, url: str, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+        """发起 GET 请求（经过缓存），返回最终响应"""
+        return self._send("GET", url, headers, **kwargs)
+
+    def post(self, url: str, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+        """发起 POST 请求，返回最终响应"""
+        return self._send("POST", url, headers, **kwargs)
+
+    def timeout_for(self, url: str) -> Tuple[float, float]:
+        """返回端点对应的超时设置"""
+        for fragment, timeout in self.ENDPOINT_TIMEOUTS:
+            if fragment in url:
+                return timeout
+        return self.DEFAULT_TIMEOUT
+
+    def _send(self, method: str, url: str, headers: Optional[dict], **kwargs) -> requests.Response:
+        """带重试地发送请求
+
+        可重试的状态码和网络错误会按退避间隔重试，重试用尽后
+        返回最后一次响应或抛出最后一次网络异常。
+        """
+        request_headers = {**self.settings.github_headers, **(headers or {})}
+        kwargs.setdefault("timeout", self.timeout_for(url))
+        resource = RateLimitScheduler.resource_for(url)
+        max_retries = max(0, self.settings.max_retries)
+
+        for attempt in range(max_retries + 1):
+            token = self.token_pool.acquire(resource)
+            request_headers["Authorization"] = f"token {token}"
+            try:
+                if method == "GET":
+                    response = cached_get(self.session, url, request_headers, self.http_cache, **kwargs)
+                else:
+                    response = self.session.request(method, url, headers=request_headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"   ⚠️ 网络错误，{delay:.1f}s后重试... (第{attempt+1}次): {str(e)[:60]}")
+                time.sleep(delay)
+                continue
+
+            self.token_pool.update(token, response, resource)
+            if response.status_code == 401 and self.token_pool.active_count:
+                # 该 token 已被移出，换下一个 token 立即重试
+                continue
+            if attempt == max_retries or not self._should_retry(response):
+                return response
+
+            if self._is_rate_limited(response) and "Retry-After" not in response.headers:
+                # 配额耗尽时换用其他 token，全部耗尽则由调度器等待至重置
+                print(f"   ⚠️ 触发 GitHub 限流，等待配额重置后重试... (第{attempt+1}次)")
+                continue
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            print(f"   ⚠️ 请求返回 {response.status_code}，{delay:.1f}s后重试... (第{attempt+1}次)")
+            time.sleep(delay)
+
+        return response
+
+    def _should_retry(self, response: requests.Response) -> bool:
+        """判断响应是否值得重试"""
+        if response.status_code in self.RETRY_STATUS:
+            return True
+        # 403 仅在限流（主限流或次级限流）时重试
+        return response.status_code == 403 and (
+            self._is_rate_limited(response) or "Retry-After" in response.headers
+        )
+
+    @staticmethod
+    def _is_rate_limited(response: requests.Response) -> bool:
+        """判断是否为配额耗尽导致的失败"""
+        return (
+            response.status_code in (403, 429)
+            and response.headers.get("X-RateLimit-Remaining") == "0"
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """指数退避，带随机抖动"""
+        ceiling = min(self.MAX_BACKOFF, self.settings.retry_backoff * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """解析 Retry-After 头（秒数或 HTTP 日期）"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(self.MAX_BACKOFF * 10, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+_shared_transports: Dict[tuple, GitHubTransport] = {}
+_shared_lock = threading.Lock()
+
+
+def get_transport(settings: Settings) -> GitHubTransport:
+    """获取进程内共享的传输层，整个运行共用一个连接池"""
+    key = tuple(settings.all_github_tokens)
+    with _shared_lock:
+        if key not in _shared_transports:
+            _shared_transports[key] = GitHubTransport(settings)
+        return _shared_transports[key]
@@ -1,5 +1,5 @@
 """Repository 数据模型"""
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, fields
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 import time
@@ -27,6 +27,7 @@ class Repository:
     open_issues_count: int = 0
     has_issues: bool = True
     topics: List[str] = None
+    starred_at: Optional[str] = None
 
     def __post_init__(self):
         """后处理初始化"""
@@ -35,7 +36,15 @@ class Repository:
 
     @classmethod
     def from_github_api(cls, data: Dict[str, Any]) -> 'Repository':
-        """从GitHub API响应创建实例"""
+        """从GitHub API响应创建实例
+
+        同时支持 star+json 媒体类型返回的 {"starred_at": ..., "repo": {...}} 结构
+        """
+        if "repo" in data and "full_name" not in data:
+            repo = cls.from_github_api(data["repo"])
+            repo.starred_at = data.get("starred_at")
+            return repo
+
         return cls(
             full_name=data['full_name'],
             description=data.get('description'),
@@ -58,6 +67,16 @@ class Repository:
             topics=data.get('topics', []),
         )
 
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> 'Repository':
+        """从本地状态文件的记录创建实例"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def to_state(self) -> Dict[str, Any]:
+        """转换为可写入本地状态文件的字典"""
+        return asdict(self)
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
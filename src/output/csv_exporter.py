@@ -1,39 +1,117 @@
 """CSV导出器"""
+import csv
+import gzip
 import os
 import pandas as pd
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Mapping, Optional, TextIO
 from datetime import datetime
 
 
 class CSVExporter:
     """CSV导出器"""
 
+    # 值为 None 时导出为"未知"的字段
+    UNKNOWN_FIELDS = ("年提交数",)
+    UNKNOWN_TEXT = "未知"
+
     def __init__(self, output_dir: str = "csv_output"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-    def export(self, data: List[Dict[str, Any]], timestamp: str) -> str:
-        """导出数据到CSV"""
-        df = pd.DataFrame(data)
+    def export(self, data: List[Dict[str, Any]], timestamp: str, name: Optional[str] = None) -> str:
+        """导出数据到CSV，name 用于区分批量模式下的不同用户"""
+        df = pd.DataFrame([self.render_row(row) for row in data])
 
-        filename = f"{self.output_dir}/github_stars_{timestamp}.csv"
+        stamp = f"{name}_{timestamp}" if name else timestamp
+        filename = f"{self.output_dir}/github_stars_{stamp}.csv"
         df.to_csv(filename, index=False, encoding="utf-8-sig")
 
         # 生成语言统计
-        self._export_language_summary(df, timestamp)
+        if not df.empty:
+            self._export_language_summary(df['编程语言'].value_counts(), len(df), stamp)
 
         return filename
 
-    def _export_language_summary(self, df: pd.DataFrame, timestamp: str):
-        """导出语言统计摘要"""
-        language_counts = df['编程语言'].value_counts()
+    @classmethod
+    def render_row(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        """导出前把未知值显示为"未知"，内存中的行保持数值类型"""
+        if not any(row.get(field) is None for field in cls.UNKNOWN_FIELDS if field in row):
+            return row
+        return {key: cls.UNKNOWN_TEXT if key in cls.UNKNOWN_FIELDS and value is None else value
+                for key, value in row.items()}
 
+    def open_stream(self, timestamp: str, compress: bool = False, chunk_rows: int = 500) -> 'StreamingCSVWriter':
+        """打开增量写入的CSV文件"""
+        return StreamingCSVWriter(self, timestamp, compress, chunk_rows)
+
+    def _export_language_summary(self, language_counts: Mapping[str, int], total: int, timestamp: str):
+        """导出语言统计摘要"""
         summary_file = f"{self.output_dir}/language_summary_{timestamp}.txt"
         with open(summary_file, "w", encoding="utf-8") as f:
             f.write(f"GitHub Stars 项目语言分类摘要\n")
             f.write(f"{'='*50}\n\n")
             f.write(f"分析时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"总项目数: {len(df)}\n\n")
+            f.write(f"总项目数: {total}\n\n")
             f.write(f"语言分布:\n")
             for lang, count in language_counts.items():
-                f.write(f"  {lang}: {count} 个项目 ({count/len(df)*100:.1f}%)\n")
+                f.write(f"  {lang}: {count} 个项目 ({count/total*100:.1f}%)\n")
+
+
+class StreamingCSVWriter:
+    """分块写入的CSV文件
+
+    行先进入缓冲区，每满 chunk_rows 行写入并刷新一次磁盘，
+    程序中途退出时已写入的行仍然保留。可选 gzip 压缩。
+    """
+
+    def __init__(self, exporter: CSVExporter, timestamp: str, compress: bool = False, chunk_rows: int = 500):
+        self.exporter = exporter
+        self.timestamp = timestamp
+        self.chunk_rows = max(1, chunk_rows)
+        suffix = ".csv.gz" if compress else ".csv"
+        self.filename = f"{exporter.output_dir}/github_stars_{timestamp}{suffix}"
+        if compress:
+            self._file: TextIO = gzip.open(self.filename, "wt", encoding="utf-8-sig", newline="")
+        else:
+            self._file = open(self.filename, "w", encoding="utf-8-sig", newline="")
+        self._writer: Optional[csv.DictWriter] = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._language_counts: Counter = Counter()
+        self.row_count = 0
+
+    def __enter__(self) -> 'StreamingCSVWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(write_summary=exc_type is None)
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]):
+        """追加若干行"""
+        for row in rows:
+            self._buffer.append(row)
+            self._language_counts[row.get("编程语言", "Unknown")] += 1
+            self.row_count += 1
+            if len(self._buffer) >= self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        """把缓冲区写入磁盘"""
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(self._buffer[0].keys()))
+            self._writer.writeheader()
+        self._writer.writerows(CSVExporter.render_row(row) for row in self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self, write_summary: bool = True):
+        """写出剩余行并关闭文件，默认同时生成语言统计"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if write_summary and self.row_count:
+            counts = dict(self._language_counts.most_common())
+            self.exporter._export_language_summary(counts, self.row_count, self.timestamp)
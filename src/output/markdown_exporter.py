@@ -1,5 +1,6 @@
 """Markdown导出器"""
 import os
+import time
 from typing import Optional
 
 
@@ -10,9 +11,62 @@ class MarkdownExporter:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-    def export(self, report_content: str, timestamp: str) -> str:
-        """导出报告到Markdown"""
-        filename = f"{self.output_dir}/analysis_report_{timestamp}.md"
+    def export(self, report_content: str, timestamp: str, name: Optional[str] = None) -> str:
+        """导出报告到Markdown，name 用于区分批量模式下的不同用户"""
+        filename = self._filename(timestamp, name)
         with open(filename, "w", encoding="utf-8") as f:
             f.write(report_content)
         return filename
+
+    def open_stream(self, timestamp: str, name: Optional[str] = None,
+                    flush_seconds: float = 1.0) -> 'StreamingMarkdownWriter':
+        """打开边生成边写入的报告文件"""
+        return StreamingMarkdownWriter(self._filename(timestamp, name), flush_seconds)
+
+    def _filename(self, timestamp: str, name: Optional[str]) -> str:
+        stamp = f"{name}_{timestamp}" if name else timestamp
+        return f"{self.output_dir}/analysis_report_{stamp}.md"
+
+
+class StreamingMarkdownWriter:
+    """流式写入的报告文件
+
+    内容先追加到 <文件名>.partial，每隔 flush_seconds 刷新一次磁盘；
+    正常结束时原子重命名为最终文件名，中途退出时已生成的部分保留在 .partial 中。
+    """
+
+    def __init__(self, filename: str, flush_seconds: float = 1.0):
+        self.filename = filename
+        self.partial_filename = filename + ".partial"
+        self.flush_seconds = flush_seconds
+        self._file = open(self.partial_filename, "w", encoding="utf-8")
+        self._flushed_at = time.monotonic()
+        self.char_count = 0
+
+    def __enter__(self) -> 'StreamingMarkdownWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+    def write(self, text: str):
+        """追加一段内容，距上次刷新超过间隔时写入磁盘"""
+        self._file.write(text)
+        self.char_count += len(text)
+        if time.monotonic() - self._flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """刷新到磁盘"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._flushed_at = time.monotonic()
+
+    def close(self, complete: bool = True):
+        """关闭文件，complete 为真时重命名为最终文件"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if complete:
+            os.replace(self.partial_filename, self.filename)
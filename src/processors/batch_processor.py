@@ -0,0 +1,73 @@
+"""多用户批量处理"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from models.repository import Repository
+from fetchers.starred_repos import StarredRepoFetcher
+from fetchers.org_members import OrgMemberFetcher
+from fetchers.repo_stats import RepoStatsFetcher
+from fetchers.readme_extractor import ReadmeExtractor
+from fetchers.graphql_enricher import GraphQLEnricher
+from processors.data_processor import DataProcessor
+from config.settings import Settings
+
+
+class BatchProcessor:
+    """团队批量模式
+
+    并发获取所有用户的 Star 列表，按仓库全名去重后每个仓库只丰富化一次，
+    再按各用户的 Star 顺序组装各自的结果。
+    """
+
+    def __init__(self, settings: Settings, data_processor: DataProcessor):
+        self.settings = settings
+        self.data_processor = data_processor
+
+    def resolve_users(self) -> List[str]:
+        """合并配置的用户名和组织成员，保持顺序去重"""
+        users = list(self.settings.github_usernames)
+        if self.settings.github_org:
+            users.extend(OrgMemberFetcher(self.settings).fetch(self.settings.github_org))
+        return list(dict.fromkeys(users))
+
+    def fetch_star_lists(self, users: List[str]) -> Dict[str, List[Repository]]:
+        """并发获取每个用户的 Star 列表"""
+        def fetch(username: str) -> List[Repository]:
+            fetcher = StarredRepoFetcher(self.settings, username)
+            return fetcher.sync() if self.settings.star_sync else fetcher.fetch()
+
+        workers = max(1, min(self.settings.max_concurrency, len(users)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(users, executor.map(fetch, users)))
+
+    def process(
+        self,
+        star_lists: Dict[str, List[Repository]],
+        readme_extractor: ReadmeExtractor,
+        stats_fetcher: RepoStatsFetcher,
+        graphql_enricher: Optional[GraphQLEnricher] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """对去重后的仓库集合做一次丰富化，返回每个用户的行"""
+        unique: Dict[str, Repository] = {}
+        for repos in star_lists.values():
+            for repo in repos:
+                unique.setdefault(repo.full_name, repo)
+
+        total = sum(len(repos) for repos in star_lists.values())
+        print(f"   {len(star_lists)} 名用户共 {total} 个 Star，去重后 {len(unique)} 个仓库")
+
+        repos = list(unique.values())
+        page_size = StarredRepoFetcher.PER_PAGE
+        pages = (repos[i:i + page_size] for i in range(0, len(repos), page_size))
+
+        rows_by_name: Dict[str, Dict[str, Any]] = {}
+        for rows in self.data_processor.iter_processed(
+            pages, readme_extractor, stats_fetcher, graphql_enricher
+        ):
+            for row in rows:
+                rows_by_name[row["仓库名"]] = row
+            print(f"   ✓ 已处理 {len(rows_by_name)}/{len(unique)} 个仓库")
+
+        return {
+            username: [rows_by_name[repo.full_name] for repo in repos]
+            for username, repos in star_lists.items()
+        }
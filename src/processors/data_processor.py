@@ -1,63 +1,346 @@
 """数据处理模块"""
-from typing import List, Dict, Any
-from datetime import datetime, timezone
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Set, Tuple
 from models.repository import Repository
 from fetchers.repo_stats import RepoStatsFetcher
 from fetchers.readme_extractor import ReadmeExtractor
+from fetchers.graphql_enricher import GraphQLEnricher
+from fetchers.participation_queue import ParticipationQueue
+from storage.enrichment_cache import EnrichmentCache
 from config.settings import Settings
 
 
+# 不生成 __repr__：asyncio.run 退出时可能格式化主任务的 repr（含返回值），
+# 整页行数据的完整 repr 会短暂占用数倍于数据本身的内存
+@dataclass(repr=False)
+class ProcessedPage:
+    """已丰富化、等待回填年提交数的一页仓库"""
+    repos: List[Repository]
+    rows: List[Dict[str, Any]]
+    # 命中丰富化缓存的字段
+    cached: Dict[str, Dict[str, Any]]
+    # 描述不可靠（README为空或LLM失败后的回退）、不写入缓存的仓库
+    unreliable: Set[str] = field(default_factory=set)
+
+
 class DataProcessor:
     """数据处理器"""
 
     def __init__(self, settings: Settings):
         self.settings = settings
+        self.enrichment_cache = None
+        if settings.enrichment_cache:
+            self.enrichment_cache = EnrichmentCache(
+                os.path.join(settings.cache_dir, "enrichment.sqlite3"),
+                settings.enrichment_cache_ttl_days
+            )
 
     def process_repositories(
         self,
         repos: List[Repository],
         readme_extractor: ReadmeExtractor,
-        stats_fetcher: RepoStatsFetcher
+        stats_fetcher: RepoStatsFetcher,
+        graphql_enricher: Optional[GraphQLEnricher] = None
+    ) -> List[Dict[str, Any]]:
+        """处理仓库数据（并发丰富化，输出顺序与输入一致）
+
+        传入 graphql_enricher 时，提交数据和 README 通过 GraphQL 批量获取，
+        批量查询未返回的仓库回退到逐个 REST 请求。
+        REST 方式的年提交数先统一触发计算，其余数据处理完后再回填，
+        GitHub 超时仍未算出的记为 None（导出时显示为"未知"）。
+        pushed_at 未变的仓库直接复用丰富化缓存中的结果，不发起任何请求。
+        README 先全部下载，再按 token 预算分批交给LLM总结。
+        """
+        with self._request_pool(stats_fetcher) as (executor, participation):
+            page = asyncio.run(self._process_async(
+                repos, readme_extractor, stats_fetcher, graphql_enricher, executor, participation
+            ))
+            return self._finish_page(page, participation)
+
+    def iter_processed(
+        self,
+        pages: Iterable[List[Repository]],
+        readme_extractor: ReadmeExtractor,
+        stats_fetcher: RepoStatsFetcher,
+        graphql_enricher: Optional[GraphQLEnricher] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """流式处理：每取到一页仓库就丰富化，按页序产出各页的行
+
+        配合 StarredRepoFetcher.iter_pages 的后台预取，后续页面的下载与当前页的
+        丰富化同时进行。所有页面共用一个请求线程池和统计队列：某页还在等待
+        GitHub 计算提交统计（202）时先暂存，继续处理后面的页面，统计就绪后再产出，
+        各页的等待因此相互重叠。
+        """
+        with self._request_pool(stats_fetcher) as (executor, participation):
+            waiting = deque()
+            for repos in pages:
+                if repos:
+                    waiting.append(asyncio.run(self._process_async(
+                        repos, readme_extractor, stats_fetcher, graphql_enricher, executor, participation
+                    )))
+                while waiting and participation.ready(row["仓库名"] for row in waiting[0].rows):
+                    yield self._finish_page(waiting.popleft(), participation)
+            while waiting:
+                yield self._finish_page(waiting.popleft(), participation)
+
+    @contextmanager
+    def _request_pool(self, stats_fetcher: RepoStatsFetcher) -> Iterator[Tuple[ThreadPoolExecutor, ParticipationQueue]]:
+        """请求线程池和统计队列，线程数即同时在途的请求数"""
+        executor = ThreadPoolExecutor(max_workers=max(1, self.settings.max_concurrency))
+        participation = ParticipationQueue(stats_fetcher, self.settings, executor)
+        try:
+            yield executor, participation
+        finally:
+            participation.close()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _finish_page(
+        self,
+        page: ProcessedPage,
+        participation: ParticipationQueue
     ) -> List[Dict[str, Any]]:
-        """处理仓库数据"""
-        processed_data = []
-        now = datetime.now(timezone.utc)
-
-        for repo in repos:
-            # 计算沉寂天数
-            days_inactive = repo._calculate_inactive_days()
-
-            # 获取提交数据（仅限近半年更新的项目）
-            commits_last_year = 0
-            last_msg = ""
-
-            if days_inactive != -1 and days_inactive < 180:
-                commits_last_year = stats_fetcher.fetch_commit_activity(repo.full_name)
-                last_msg = stats_fetcher.fetch_latest_commit(repo.full_name, repo.default_branch)
-
-            # 丰富描述信息
-            description = repo.description
-            if not description or description == "无描述":
-                description = readme_extractor.extract(repo.full_name)
-
-            # 构建最终数据
-            processed_data.append({
-                "仓库名": repo.full_name,
-                "编程语言": repo.language or "Unknown",
-                "项目描述": description,
-                "仓库链接": repo.html_url,
-                "Star数": repo.stargazers_count,
-                "最近更新日期": repo._format_date(repo.pushed_at),
-                "沉寂天数": days_inactive,
-                "年提交数": commits_last_year,
-                "最近更新内容": last_msg,
-                "仓库状态": repo._get_status(),
-                "项目年龄": repo._calculate_project_age(),
-                "关注者数": repo.watchers_count,
-                "订阅者数": repo.subscribers_count,
-                "Fork数": repo.forks_count,
-                "开放Issues": repo.open_issues_count,
-                "项目标签": ", ".join(repo.topics) if repo.topics else "无",
-            })
-
-        return processed_data
+        """等待该页的统计结果并回填，保存丰富化缓存"""
+        self._fill_commit_activity(page.rows, participation)
+        self._store_enrichment(page)
+        return page.rows
+
+    async def _process_async(
+        self,
+        repos: List[Repository],
+        readme_extractor: ReadmeExtractor,
+        stats_fetcher: RepoStatsFetcher,
+        graphql_enricher: Optional[GraphQLEnricher],
+        executor: ThreadPoolExecutor,
+        participation: ParticipationQueue
+    ) -> ProcessedPage:
+        """按并发上限同时处理一页仓库
+
+        年提交数由 participation 在后台解析，由 _finish_page 回填。
+        """
+        loop = asyncio.get_running_loop()
+
+        # 阻塞的网络调用放到共用的请求线程池中执行
+        async def run_blocking(func, *args):
+            return await loop.run_in_executor(executor, func, *args)
+
+        cached = await run_blocking(self._load_cached, repos)
+        prefetched = {name: dict(values) for name, values in cached.items()}
+        if graphql_enricher is not None:
+            fetched = await self._prefetch_graphql(repos, graphql_enricher, run_blocking, cached)
+            for name, values in fetched.items():
+                prefetched[name] = {**values, **prefetched.get(name, {})}
+
+        # 先为所有候选仓库发出统计请求，让 GitHub 在后台开始计算
+        participation.submit([
+            repo.full_name for repo in repos
+            if self._needs_activity(repo._calculate_inactive_days())
+            and "commits_last_year" not in prefetched.get(repo.full_name, {})
+        ])
+
+        # 需要总结的README正文，收集齐后批量交给LLM
+        readmes: Dict[str, str] = {}
+        tasks = [
+            self._enrich_repository(
+                repo, readme_extractor, stats_fetcher, run_blocking,
+                prefetched.get(repo.full_name), readmes
+            )
+            for repo in repos
+        ]
+        # gather 按提交顺序返回结果，保证输出顺序确定
+        rows = await asyncio.gather(*tasks)
+        unreliable = await run_blocking(self._fill_descriptions, rows, readmes, readme_extractor)
+        return ProcessedPage(repos, rows, cached, unreliable)
+
+    async def _enrich_repository(
+        self,
+        repo: Repository,
+        readme_extractor: ReadmeExtractor,
+        stats_fetcher: RepoStatsFetcher,
+        run_blocking,
+        prefetched: Optional[Dict[str, Any]] = None,
+        readmes: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """丰富单个仓库的数据
+
+        需要总结的README正文写入 readmes，描述由 _fill_descriptions 批量回填。
+        """
+        prefetched = prefetched or {}
+        readmes = readmes if readmes is not None else {}
+
+        # 计算沉寂天数
+        days_inactive = repo._calculate_inactive_days()
+
+        # 获取提交数据（仅限近半年更新的项目）
+        commits_last_year = 0
+        last_msg = ""
+        pending = {}
+
+        if self._needs_activity(days_inactive):
+            if "commits_last_year" in prefetched:
+                commits_last_year = prefetched["commits_last_year"]
+                last_msg = prefetched["last_msg"]
+            else:
+                # 年提交数由 ParticipationQueue 回填
+                pending["last_msg"] = run_blocking(
+                    stats_fetcher.fetch_latest_commit, repo.full_name, repo.default_branch
+                )
+
+        # 丰富描述信息
+        description = repo.description
+        if self._needs_description(repo):
+            if "description" in prefetched:
+                description = prefetched["description"]
+            elif prefetched.get("readme"):
+                readmes[repo.full_name] = prefetched["readme"]
+            else:
+                # GraphQL 只尝试常见文件名，找不到时由 REST /readme 解析实际的 README
+                pending["readme"] = run_blocking(readme_extractor.fetch_text, repo.full_name)
+
+        if pending:
+            results = dict(zip(pending, await asyncio.gather(*pending.values())))
+            last_msg = results.get("last_msg", last_msg)
+            if "readme" in results:
+                readmes[repo.full_name] = results["readme"]
+
+        # 构建最终数据
+        return self._build_row(repo, description, days_inactive, commits_last_year, last_msg)
+
+    async def _prefetch_graphql(
+        self,
+        repos: List[Repository],
+        graphql_enricher: GraphQLEnricher,
+        run_blocking,
+        cached: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """分批并发执行 GraphQL 查询，已命中缓存的字段不再查询"""
+        cached = cached or {}
+        commit_repos = [
+            r.full_name for r in repos
+            if self._needs_activity(r._calculate_inactive_days())
+            and "commits_last_year" not in cached.get(r.full_name, {})
+        ]
+        readme_repos = [
+            r.full_name for r in repos
+            if self._needs_description(r) and "description" not in cached.get(r.full_name, {})
+        ]
+        wanted = list(dict.fromkeys(commit_repos + readme_repos))
+        if not wanted:
+            return {}
+
+        commit_set, readme_set = set(commit_repos), set(readme_repos)
+        batch_size = max(1, self.settings.graphql_batch_size)
+        batches = [wanted[i:i + batch_size] for i in range(0, len(wanted), batch_size)]
+        print(f"   - 通过 GraphQL 批量获取 {len(wanted)} 个仓库的详情 ({len(batches)} 次查询)")
+
+        results = await asyncio.gather(*[
+            run_blocking(
+                graphql_enricher.fetch_batch,
+                [name for name in batch if name in commit_set],
+                [name for name in batch if name in readme_set]
+            )
+            for batch in batches
+        ])
+
+        prefetched = {}
+        for result in results:
+            prefetched.update(result)
+        return prefetched
+
+    def _load_cached(self, repos: List[Repository]) -> Dict[str, Dict[str, Any]]:
+        """读取 pushed_at 未变的仓库的丰富化结果"""
+        if self.enrichment_cache is None:
+            return {}
+        cached = self.enrichment_cache.get_many((r.full_name, r.pushed_at) for r in repos)
+        for values in cached.values():
+            # 年提交数和最近更新内容需成对复用
+            if "commits_last_year" not in values or "last_msg" not in values:
+                values.pop("commits_last_year", None)
+                values.pop("last_msg", None)
+        if cached:
+            print(f"   - {len(cached)} 个仓库自上次运行后无新推送，复用缓存结果")
+        return cached
+
+    def _store_enrichment(self, page: ProcessedPage):
+        """保存本次新计算的丰富化结果（失败或未知的值不缓存）"""
+        if self.enrichment_cache is None:
+            return
+        entries = []
+        for repo, row in zip(page.repos, page.rows):
+            hit = page.cached.get(repo.full_name, {})
+            values = {}
+            if self._needs_activity(row["沉寂天数"]) and "commits_last_year" not in hit:
+                if isinstance(row["年提交数"], int) and row["最近更新内容"] != "无法获取":
+                    values["commits_last_year"] = row["年提交数"]
+                    values["last_msg"] = row["最近更新内容"]
+            if (self._needs_description(repo) and "description" not in hit
+                    and repo.full_name not in page.unreliable):
+                values["description"] = row["项目描述"]
+            if values:
+                entries.append((repo.full_name, repo.pushed_at, values))
+        self.enrichment_cache.put_many(entries)
+
+    @staticmethod
+    def _fill_descriptions(
+        rows: List[Dict[str, Any]],
+        readmes: Dict[str, str],
+        readme_extractor: ReadmeExtractor
+    ) -> Set[str]:
+        """批量总结收集到的README并回填描述，返回没有得到可靠总结的仓库"""
+        fallbacks: Set[str] = set()
+        if not readmes:
+            return fallbacks
+        summaries = readme_extractor.summarize_many(readmes, fallbacks)
+        for row in rows:
+            if row["仓库名"] in summaries:
+                row["项目描述"] = summaries[row["仓库名"]]
+        return fallbacks
+
+    @staticmethod
+    def _fill_commit_activity(rows: List[Dict[str, Any]], participation: ParticipationQueue):
+        """等待后台统计结果并回填到对应行"""
+        for row in rows:
+            if row["仓库名"] in participation:
+                row["年提交数"] = participation.result(row["仓库名"])
+
+    @staticmethod
+    def _needs_activity(days_inactive: int) -> bool:
+        """是否需要获取提交数据（仅限近半年更新的项目）"""
+        return days_inactive != -1 and days_inactive < 180
+
+    @staticmethod
+    def _needs_description(repo: Repository) -> bool:
+        """是否需要从README补充描述"""
+        return not repo.description or repo.description == "无描述"
+
+    def _build_row(
+        self,
+        repo: Repository,
+        description: str,
+        days_inactive: int,
+        commits_last_year: int,
+        last_msg: str
+    ) -> Dict[str, Any]:
+        """构建输出行"""
+        return {
+            "仓库名": repo.full_name,
+            "编程语言": repo.language or "Unknown",
+            "项目描述": description,
+            "仓库链接": repo.html_url,
+            "Star数": repo.stargazers_count,
+            "最近更新日期": repo._format_date(repo.pushed_at),
+            "沉寂天数": days_inactive,
+            "年提交数": commits_last_year,
+            "最近更新内容": last_msg,
+            "仓库状态": repo._get_status(),
+            "项目年龄": repo._calculate_project_age(),
+            "关注者数": repo.watchers_count,
+            "订阅者数": repo.subscribers_count,
+            "Fork数": repo.forks_count,
+            "开放Issues": repo.open_issues_count,
+            "项目标签": ", ".join(repo.topics) if repo.topics else "无",
+        }
@@ -0,0 +1,247 @@
+"""README本地抽取式总结"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class Block:
+    """README中的一个文本块"""
+    kind: str           # heading / paragraph / list / quote / callout
+    text: str
+    level: int = 0      # 标题级别
+    centered: bool = False
+
+
+class ReadmeSummarizer:
+    """从README中抽取项目简介，不调用LLM
+
+    去掉代码块、表格、徽章、图片和HTML标签后按段落解析Markdown结构，
+    取标题下的标语或第一段描述性文字，并按位置、长度和措辞给出 0-1 的置信度。
+    置信度足够高时可以直接作为总结，省去一次LLM请求。
+    """
+
+    # 只解析README开头部分
+    MAX_CHARS = 8000
+    # 总结的最大长度
+    MAX_SUMMARY_CHARS = 200
+
+    # 这些章节下的文字不是项目简介
+    SKIP_SECTIONS = re.compile(
+        r"install|usage|getting started|quick ?start|build|setup|configur|contribut|licen[cs]e|"
+        r"table of contents|contents|toc|changelog|faq|sponsor|support|acknowledg|credits|author|"
+        r"example|demo|screenshot|requirement|document|安装|使用|用法|快速开始|配置|贡献|许可|目录|"
+        r"更新日志|常见问题|赞助|致谢|示例|截图|文档",
+        re.IGNORECASE
+    )
+    # 这些章节通常就是项目简介
+    INTRO_SECTIONS = re.compile(
+        r"about|introduction|overview|what is|description|summary|简介|介绍|概述|关于|是什么",
+        re.IGNORECASE
+    )
+    # 描述性措辞：xxx is a ... / 一个用于...的工具
+    DESCRIPTIVE = re.compile(
+        r"^(\S+\s+)?(is|are)\s+(a|an|the)\b|\b(a|an)\s+\w+|\b(provides?|allows?|enables?|lets|helps?|"
+        r"makes?|implements?|supports?|library|framework|tool|toolkit|plugin|extension|app|"
+        r"application|cli|server|client|engine|collection|list|sdk|api|wrapper)\b|"
+        r"是一个|是一款|一个|一款|用于|提供|支持|实现|基于|工具|框架|库|插件|合集|集合",
+        re.IGNORECASE
+    )
+    # 出现这些内容的段落不像简介
+    NOISE = re.compile(
+        r"pip install|npm (i|install)|yarn add|brew install|go get|cargo (add|install)|git clone|"
+        r"https?://|\bwip\b|work in progress|under construction|\btodo\b|coming soon|\btranslations?\b|"
+        r"\bread (this|the docs)|\bsee (the|our)\b|\bEnglish\b|中文|简体|繁體",
+        re.IGNORECASE
+    )
+    # 弃用、停止维护等状态提示，不是项目简介
+    STATUS = re.compile(
+        r"deprecat|no longer (maintained|supported|developed)|unmaintained|\barchived\b|\bwarning\b|"
+        r"不再维护|停止维护|已弃用|已废弃|已归档",
+        re.IGNORECASE
+    )
+
+    _FENCE = re.compile(r"^\s*(```|~~~)")
+    _HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+    _HTML_BLOCK = re.compile(r"<(script|style|table|pre|code|details|picture|svg)\b.*?</\1\s*>",
+                             re.DOTALL | re.IGNORECASE)
+    _LINKED_IMAGE = re.compile(r"\[\s*!\[[^\]]*\]\([^)]*\)\s*\]\([^)]*\)|\[\s*!\[[^\]]*\]\[[^\]]*\]\s*\]\[[^\]]*\]")
+    _IMAGE = re.compile(r"!\[[^\]]*\](\([^)]*\)|\[[^\]]*\])")
+    _LINK = re.compile(r"\[([^\]]*)\](\([^)]*\)|\[[^\]]*\])")
+    _REF_DEF = re.compile(r"^\s*\[[^\]]+\]:\s*\S+")
+    _TAG = re.compile(r"</?[A-Za-z][^>]*>")
+    _CENTERED = re.compile(r"<(p|h\d|div)[^>]*align=[\"']?center", re.IGNORECASE)
+    _TABLE_ROW = re.compile(r"^\s*\|.*\|\s*$|^\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)+\|?\s*$")
+    _HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+    _SETEXT = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+    # GitHub 提示块：> [!NOTE]、> **Warning** 等
+    _CALLOUT = re.compile(
+        r"^\s*>\s*(\[!(note|tip|important|warning|caution)\]|\*\*(note|tip|important|warning|caution)\*\*)",
+        re.IGNORECASE
+    )
+    _LIST_ITEM = re.compile(r"^\s*([-*+]|\d+[.)])\s+")
+    _RULE = re.compile(r"^\s*([-*_]\s*){3,}$")
+    _EMPHASIS = re.compile(r"(\*\*|__|\*|_|~~)(?=\S)(.+?)(?<=\S)\1")
+    _INLINE_CODE = re.compile(r"`+([^`]*)`+")
+    _SHORTCODE = re.compile(r":[a-z0-9_+-]+:")
+    _ENTITY = re.compile(r"&(nbsp|amp|lt|gt|quot|#\d+);")
+    _SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+|(?<=[。！？])")
+
+    def summarize(self, readme_content: str) -> Tuple[str, float]:
+        """返回 (总结, 置信度)，找不到合适段落时返回 ("", 0.0)"""
+        if not readme_content:
+            return "", 0.0
+        blocks = self._parse(readme_content[:self.MAX_CHARS])
+
+        best: Optional[Tuple[float, str]] = None
+        section: Optional[str] = None
+        headings_seen = 0
+        for block in blocks:
+            if block.kind == "heading":
+                headings_seen += 1
+                section = block.text
+                continue
+            if block.kind in ("list", "callout"):
+                continue
+            if section and headings_seen > 1 and self.SKIP_SECTIONS.search(section):
+                continue
+
+            text = block.text
+            if not self._is_prose(text):
+                continue
+            score = self._score(block, section, headings_seen)
+            if best is None or score > best[0]:
+                best = (score, text)
+            # 越往后越不像简介，第一个合格段落通常就是答案
+            if headings_seen > 2 or score >= 0.7:
+                break
+
+        if best is None:
+            return "", 0.0
+        return self._shorten(best[1]), round(min(max(best[0], 0.0), 1.0), 2)
+
+    def _parse(self, text: str) -> List[Block]:
+        """按空行切分为标题、段落、列表、引用和提示块，同时去掉代码、表格、徽章和HTML"""
+        text = self._HTML_COMMENT.sub("", text.replace("\r\n", "\n"))
+        text = self._HTML_BLOCK.sub("\n", text)
+
+        blocks: List[Block] = []
+        lines: List[str] = []
+        kind = "paragraph"
+        centered = False
+        in_fence = False
+
+        def close():
+            nonlocal lines, kind, centered
+            cleaned = " ".join(line for line in (self._clean(l) for l in lines) if line)
+            if cleaned:
+                blocks.append(Block(kind, cleaned, centered=centered))
+            lines, kind, centered = [], "paragraph", False
+
+        for raw in text.split("\n"):
+            if self._FENCE.match(raw):
+                in_fence = not in_fence
+                close()
+                continue
+            if in_fence or self._TABLE_ROW.match(raw) or self._REF_DEF.match(raw):
+                continue
+            if not raw.strip() or self._RULE.match(raw) and not lines:
+                close()
+                continue
+
+            heading = self._HEADING.match(raw)
+            if heading:
+                close()
+                title = self._clean(heading.group(2))
+                blocks.append(Block("heading", title, level=len(heading.group(1))))
+                continue
+            if lines and self._SETEXT.match(raw):
+                title = self._clean(" ".join(lines))
+                lines = []
+                close()
+                blocks.append(Block("heading", title, level=1 if "=" in raw else 2))
+                continue
+
+            if not lines:
+                if self._LIST_ITEM.match(raw):
+                    kind = "list"
+                elif raw.lstrip().startswith(">"):
+                    kind = "callout" if self._CALLOUT.match(raw) else "quote"
+            if self._CENTERED.search(raw):
+                centered = True
+            # HTML 标题（<h1 align="center">项目名</h1>）单独成块
+            if re.match(r"^\s*<h[1-6]\b", raw, re.IGNORECASE):
+                close()
+                title = self._clean(raw)
+                if title:
+                    blocks.append(Block("heading", title, level=1))
+                continue
+            lines.append(raw.lstrip().lstrip(">").strip() if kind in ("quote", "callout") else raw)
+        close()
+        return blocks
+
+    def _clean(self, line: str) -> str:
+        """去掉徽章、图片、链接地址、HTML标签和行内格式，只保留文字"""
+        line = self._LINKED_IMAGE.sub(" ", line)
+        line = self._IMAGE.sub(" ", line)
+        line = self._LINK.sub(r"\1", line)
+        line = self._TAG.sub(" ", line)
+        line = self._INLINE_CODE.sub(r"\1", line)
+        line = self._EMPHASIS.sub(r"\2", line)
+        line = self._SHORTCODE.sub("", line)
+        line = self._ENTITY.sub(" ", line)
+        return re.sub(r"\s+", " ", line).strip(" |·•-")
+
+    def _is_prose(self, text: str) -> bool:
+        """是否是成句的文字（排除只剩链接文字、版本号或零散词语的段落）"""
+        wide = sum(1 for ch in text if ord(ch) > 0x2E80)
+        if wide >= 8:
+            return True
+        words = re.findall(r"[A-Za-z]{2,}", text)
+        return len(words) >= 5 and len(text) >= 25
+
+    def _score(self, block: Block, section: Optional[str], headings_seen: int) -> float:
+        """按位置、长度和措辞估计置信度"""
+        text = block.text
+        score = 0.0
+
+        # 位置：紧跟项目标题或在简介章节中
+        if headings_seen <= 1:
+            score += 0.4
+        elif section and self.INTRO_SECTIONS.search(section):
+            score += 0.35
+        else:
+            score += 0.1
+
+        # 长度：一两句话最合适
+        length = len(text)
+        if 30 <= length <= 300:
+            score += 0.25
+        elif length <= 600:
+            score += 0.1
+
+        if self.DESCRIPTIVE.search(text):
+            score += 0.2
+        # 居中的 HTML 段落或引用块通常是标语
+        if block.centered or block.kind == "quote":
+            score += 0.1
+        if self.NOISE.search(text):
+            score -= 0.3
+        if self.STATUS.search(text):
+            score -= 0.5
+        return score
+
+    def _shorten(self, text: str) -> str:
+        """截取前一两句，不超过 MAX_SUMMARY_CHARS"""
+        sentences = [s for s in self._SENTENCE_END.split(text) if s.strip()]
+        summary = ""
+        for sentence in sentences[:2]:
+            candidate = f"{summary} {sentence}".strip() if summary else sentence.strip()
+            if summary and len(candidate) > self.MAX_SUMMARY_CHARS:
+                break
+            summary = candidate
+            if len(summary) >= 40:
+                break
+        if len(summary) > self.MAX_SUMMARY_CHARS:
+            summary = summary[:self.MAX_SUMMARY_CHARS - 3].rstrip() + "..."
+        return summary
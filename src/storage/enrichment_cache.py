@@ -0,0 +1,91 @@
+"""仓库丰富化结果缓存"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+class EnrichmentCache:
+    """按仓库全名保存年提交数、最近更新内容和总结后的描述
+
+    每条记录附带计算时的 pushed_at；仓库没有新推送且未超过 TTL 时，
+    直接复用上次结果，跳过所有网络请求和 LLM 调用。
+    """
+
+    FIELDS = ("commits_last_year", "last_msg", "description")
+
+    def __init__(self, path: str, ttl_days: float = 0):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400 if ttl_days > 0 else None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS enrichment (
+                full_name TEXT PRIMARY KEY,
+                pushed_at TEXT,
+                commits_last_year INTEGER,
+                last_msg TEXT,
+                description TEXT,
+                computed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, repos: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, Dict[str, Any]]:
+        """批量查询 (仓库全名, pushed_at)，只返回 pushed_at 一致且未过期的字段"""
+        wanted = dict(repos)
+        if not wanted:
+            return {}
+
+        names = list(wanted)
+        rows: List[tuple] = []
+        with self._lock:
+            for i in range(0, len(names), 500):
+                chunk = names[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(self._conn.execute(
+                    "SELECT full_name, pushed_at, commits_last_year, last_msg, description, computed_at "
+                    f"FROM enrichment WHERE full_name IN ({placeholders})",
+                    chunk
+                ).fetchall())
+
+        now = time.time()
+        results = {}
+        for full_name, pushed_at, commits, last_msg, description, computed_at in rows:
+            if pushed_at != wanted[full_name]:
+                continue
+            if self.ttl_seconds is not None and now - computed_at > self.ttl_seconds:
+                continue
+            values = {"commits_last_year": commits, "last_msg": last_msg, "description": description}
+            results[full_name] = {k: v for k, v in values.items() if v is not None}
+        return results
+
+    def put_many(self, entries: Iterable[Tuple[str, Optional[str], Dict[str, Any]]]):
+        """批量写入 (仓库全名, pushed_at, 字段)
+
+        pushed_at 未变时与已有字段合并，变化时整条替换。
+        """
+        now = time.time()
+        with self._lock:
+            for full_name, pushed_at, values in entries:
+                values = {k: v for k, v in values.items() if k in self.FIELDS and v is not None}
+                if not values:
+                    continue
+                row = self._conn.execute(
+                    "SELECT pushed_at, commits_last_year, last_msg, description FROM enrichment WHERE full_name = ?",
+                    (full_name,)
+                ).fetchone()
+                merged = {"commits_last_year": None, "last_msg": None, "description": None}
+                if row and row[0] == pushed_at:
+                    merged.update({"commits_last_year": row[1], "last_msg": row[2], "description": row[3]})
+                merged.update(values)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO enrichment VALUES (?, ?, ?, ?, ?, ?)",
+                    (full_name, pushed_at, merged["commits_last_year"], merged["last_msg"],
+                     merged["description"], now)
+                )
+            self._conn.commit()
@@ -0,0 +1,46 @@
+"""分析报告缓存"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+
+class ReportCache:
+    """保存每个用户最近一次分析的输入指纹和报告
+
+    每个范围（用户 + 模型 + 报告版本）只保留一条记录，包含：
+    - base: 最近一次完整生成的报告及其指纹
+    - last: 最近一次输出的报告（完整报告或变化报告）及其指纹、各分组输入
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                scope TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, scope: str) -> Optional[Dict[str, Any]]:
+        """读取一个范围的记录"""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM reports WHERE scope = ?", (scope,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, scope: str, data: Dict[str, Any]):
+        """写入（覆盖）一个范围的记录"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?)",
+                (scope, json.dumps(data, ensure_ascii=False))
+            )
+            self._conn.commit()
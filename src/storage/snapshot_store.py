@@ -0,0 +1,171 @@
+"""运行结果快照历史库"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+class SnapshotStore:
+    """把每次运行处理后的行追加到 SQLite 历史库
+
+    - 按 (仓库, 运行) 建主键索引，跨运行查询无需重新解析 CSV
+    - 语言、标签、状态、描述等重复字段做字典编码，只存整数 id
+    - 只追加，不修改历史记录
+    """
+
+    # 字典编码的字段: 行字段 -> 快照表列
+    DICT_FIELDS = {
+        "编程语言": "language_id",
+        "仓库状态": "status_id",
+        "项目标签": "topics_id",
+        "项目描述": "description_id",
+        "最近更新内容": "last_msg_id",
+    }
+    # 数值字段: 行字段 -> 快照表列
+    NUMERIC_FIELDS = {
+        "Star数": "stars",
+        "Fork数": "forks",
+        "关注者数": "watchers",
+        "订阅者数": "subscribers",
+        "开放Issues": "open_issues",
+        "沉寂天数": "inactive_days",
+        "年提交数": "commits_last_year",
+    }
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dict_ids: Dict[Tuple[str, str], int] = {}
+        self._repo_ids: Dict[str, int] = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        """建表"""
+        value_columns = ",\n".join(
+            f"{column} INTEGER" for column in [*self.NUMERIC_FIELDS.values(), *self.DICT_FIELDS.values()]
+        )
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY,
+                run_at TEXT NOT NULL,
+                username TEXT
+            );
+            CREATE TABLE IF NOT EXISTS repos (
+                repo_id INTEGER PRIMARY KEY,
+                full_name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS dictionary (
+                value_id INTEGER PRIMARY KEY,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                UNIQUE (field, value)
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                repo_id INTEGER NOT NULL,
+                run_id INTEGER NOT NULL,
+                pushed_date TEXT,
+                {value_columns},
+                PRIMARY KEY (repo_id, run_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_snapshots_run ON snapshots(run_id);
+            CREATE INDEX IF NOT EXISTS idx_runs_at ON runs(run_at);
+            """
+        )
+        self._conn.commit()
+
+    def start_run(self, run_at: str, username: Optional[str] = None) -> int:
+        """登记一次运行，返回 run_id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (run_at, username) VALUES (?, ?)", (run_at, username)
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def append_rows(self, run_id: int, rows: Iterable[Dict[str, Any]]):
+        """追加一批处理后的行"""
+        columns = ["repo_id", "run_id", "pushed_date", *self.NUMERIC_FIELDS.values(), *self.DICT_FIELDS.values()]
+        placeholders = ",".join("?" * len(columns))
+        with self._lock:
+            records = []
+            for row in rows:
+                record = [self._repo_id(row["仓库名"]), run_id, row.get("最近更新日期")]
+                record.extend(self._to_int(row.get(field)) for field in self.NUMERIC_FIELDS)
+                record.extend(self._dict_id(field, row.get(field)) for field in self.DICT_FIELDS)
+                records.append(record)
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO snapshots ({','.join(columns)}) VALUES ({placeholders})",
+                records
+            )
+            self._conn.commit()
+
+    def history(self, full_name: str, field: str) -> List[Tuple[str, Any]]:
+        """查询仓库某个字段在各次运行中的取值，按运行时间排序"""
+        if field in self.NUMERIC_FIELDS:
+            select, join = f"s.{self.NUMERIC_FIELDS[field]}", ""
+        elif field in self.DICT_FIELDS:
+            select = "d.value"
+            join = f"LEFT JOIN dictionary d ON d.value_id = s.{self.DICT_FIELDS[field]}"
+        else:
+            raise ValueError(f"不支持的字段: {field}")
+
+        with self._lock:
+            return self._conn.execute(
+                f"""
+                SELECT r.run_at, {select}
+                FROM snapshots s
+                JOIN repos p ON p.repo_id = s.repo_id
+                JOIN runs r ON r.run_id = s.run_id
+                {join}
+                WHERE p.full_name = ?
+                ORDER BY r.run_at
+                """,
+                (full_name,)
+            ).fetchall()
+
+    def star_history(self, full_name: str) -> List[Tuple[str, int]]:
+        """Star 数变化"""
+        return self.history(full_name, "Star数")
+
+    def commit_history(self, full_name: str) -> List[Tuple[str, Optional[int]]]:
+        """年提交数变化（衡量活跃度衰减）"""
+        return self.history(full_name, "年提交数")
+
+    def archived_since(self, full_name: str) -> Optional[str]:
+        """首次观察到仓库处于归档状态的运行时间"""
+        for run_at, status in self.history(full_name, "仓库状态"):
+            if status and "已归档" in status:
+                return run_at
+        return None
+
+    def _repo_id(self, full_name: str) -> int:
+        """获取或创建仓库 id（调用方需持有锁）"""
+        if full_name not in self._repo_ids:
+            self._conn.execute("INSERT OR IGNORE INTO repos (full_name) VALUES (?)", (full_name,))
+            self._repo_ids[full_name] = self._conn.execute(
+                "SELECT repo_id FROM repos WHERE full_name = ?", (full_name,)
+            ).fetchone()[0]
+        return self._repo_ids[full_name]
+
+    def _dict_id(self, field: str, value: Any) -> Optional[int]:
+        """字典编码（调用方需持有锁）"""
+        if value is None:
+            return None
+        key = (field, str(value))
+        if key not in self._dict_ids:
+            self._conn.execute("INSERT OR IGNORE INTO dictionary (field, value) VALUES (?, ?)", key)
+            self._dict_ids[key] = self._conn.execute(
+                "SELECT value_id FROM dictionary WHERE field = ? AND value = ?", key
+            ).fetchone()[0]
+        return self._dict_ids[key]
+
+    @staticmethod
+    def _to_int(value: Any) -> Optional[int]:
+        """数值字段转换，"未知"等非数值记为 NULL"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,52 @@
+"""Star 列表本地状态存储"""
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from models.repository import Repository
+
+
+@dataclass
+class StarState:
+    """上次同步得到的 Star 列表"""
+    repos: List[Repository] = field(default_factory=list)
+    # 已取消 Star 的仓库: 仓库名 -> 发现取消的时间
+    tombstones: Dict[str, str] = field(default_factory=dict)
+    last_full_sync: Optional[str] = None
+
+
+class StarStateStore:
+    """以 JSON 文件保存 Star 列表状态"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> StarState:
+        """读取状态，文件不存在或损坏时返回空状态"""
+        if not os.path.exists(self.path):
+            return StarState()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️ 状态文件读取失败，将重新全量同步: {e}")
+            return StarState()
+
+        return StarState(
+            repos=[Repository.from_state(item) for item in data.get("repos", [])],
+            tombstones=data.get("tombstones", {}),
+            last_full_sync=data.get("last_full_sync"),
+        )
+
+    def save(self, state: StarState):
+        """原子写入状态文件"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "repos": [repo.to_state() for repo in state.repos],
+            "tombstones": state.tombstones,
+            "last_full_sync": state.last_full_sync,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
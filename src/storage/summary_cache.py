@@ -0,0 +1,96 @@
+"""README 总结缓存"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+
+class SummaryCache:
+    """按内容寻址的 README 总结缓存
+
+    键为 (送入模型的README文本摘要, 模型名, 提示词版本)，README 未变时
+    任何运行、任何用户都不再重复总结。使用 WAL 模式，多个进程可同时读写
+    同一个缓存目录；超出容量时按最近最少使用顺序淘汰。
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 其他进程持有写锁时最多等待 30 秒
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries(accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str) -> str:
+        """缓存键：README文本的 SHA-256 + 模型名 + 提示词版本"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{digest}:{model}:{prompt_version}"
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """批量查询，返回命中的 {键: 总结}"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        results = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                results.update(self._conn.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+            if results:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE summaries SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in results]
+                )
+                self._conn.commit()
+        return results
+
+    def put_many(self, entries: Iterable[Tuple[str, str]]):
+        """批量写入 (键, 总结)"""
+        now = time.time()
+        rows = [(key, summary, len(summary.encode("utf-8")), now) for key, summary in entries]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """超出容量时按最近最少使用顺序淘汰（调用方需持有锁）
+
+        其他进程也会写入，总量每次从数据库重新统计。
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM summaries ORDER BY accessed_at"
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+            total -= size
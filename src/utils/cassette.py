@@ -0,0 +1,251 @@
+"""HTTP 交互录制 / 回放"""
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from config.settings import Settings
+
+# 正文以解码后的形式保存，这些响应头回放时不再适用
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(RuntimeError):
+    """回放时找不到匹配的录制记录"""
+
+
+class Cassette:
+    """把 GitHub 和 LLM 的 HTTP 交互保存到 gzip 压缩的 JSON Lines 文件
+
+    - record: 正常发出请求，同时记录每次交互（不保存凭据）
+    - replay: 不访问网络，按 (方法, URL, 请求体摘要) 匹配录制记录依次返回；
+      请求体不同（如提示词含当前时间）时退回按 (方法, URL) 的录制顺序匹配
+    - latency_scale: 回放时按录制耗时的倍数模拟延迟，0 表示不等待
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 0.0):
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的录制模式: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = max(0.0, latency_scale)
+        self._lock = threading.Lock()
+        self._exact: Dict[Tuple[str, str, str], Deque[dict]] = defaultdict(deque)
+        self._by_url: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._file = None
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+            atexit.register(self.close)
+        else:
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def _load(self):
+        """读取录制文件，建立匹配索引"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"❌ 找不到录制文件: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._exact[(entry["method"], entry["url"], entry["body_hash"])].append(entry)
+                self._by_url[(entry["method"], entry["url"])].append(entry)
+        total = sum(len(entries) for entries in self._by_url.values())
+        print(f"📼 回放模式: 已加载 {total} 条录制记录 ({self.path})")
+
+    @staticmethod
+    def _body_hash(body: Optional[bytes]) -> str:
+        return hashlib.sha256(body or b"").hexdigest()[:16]
+
+    @staticmethod
+    def _encode_body(body: bytes) -> Dict[str, str]:
+        """文本正文直接保存，二进制正文用 base64"""
+        try:
+            return {"body": body.decode("utf-8")}
+        except UnicodeDecodeError:
+            return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+    @staticmethod
+    def _decode_body(entry: dict) -> bytes:
+        if "body_b64" in entry:
+            return base64.b64decode(entry["body_b64"])
+        return entry.get("body", "").encode("utf-8")
+
+    def record(self, method: str, url: str, request_body: Optional[bytes],
+               status: int, headers: Dict[str, str], body: bytes, elapsed: float):
+        """追加一条交互"""
+        entry = {
+            "method": method,
+            "url": url,
+            "body_hash": self._body_hash(request_body),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "elapsed": round(elapsed, 4),
+            **self._encode_body(body),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.write(line + "\n")
+
+    def play(self, method: str, url: str, request_body: Optional[bytes]) -> Tuple[int, Dict[str, str], bytes]:
+        """取出匹配的下一条交互，返回 (状态码, 响应头, 正文)"""
+        with self._lock:
+            entry = self._take(method, url, self._body_hash(request_body))
+        if entry is None:
+            raise CassetteMissError(f"录制文件中没有匹配的请求: {method} {url}")
+        if self.latency_scale:
+            time.sleep(entry.get("elapsed", 0) * self.latency_scale)
+        return entry["status"], entry["headers"], self._decode_body(entry)
+
+    def _take(self, method: str, url: str, body_hash: str) -> Optional[dict]:
+        """优先精确匹配，其次按 URL 顺序匹配（调用方需持有锁）"""
+        exact = self._exact.get((method, url, body_hash))
+        by_url = self._by_url.get((method, url))
+        entry = exact.popleft() if exact else None
+        if entry is None and by_url:
+            entry = by_url[0]
+            self._exact[(method, url, entry["body_hash"])].remove(entry)
+        if entry is not None:
+            by_url.remove(entry)
+        return entry
+
+    def close(self):
+        """结束录制，写入文件"""
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+                print(f"📼 录制完成: {self.path}")
+
+
+class CassetteAdapter(BaseAdapter):
+    """requests 传输适配器：录制或回放 GitHub 请求"""
+
+    def __init__(self, cassette: Cassette, adapter: HTTPAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        if self.cassette.recording:
+            start = time.monotonic()
+            response = self.adapter.send(request, stream=stream, **kwargs)
+            # 录制时完整读取正文，截断等处理在上层照常进行
+            content = response.content
+            self.cassette.record(request.method, request.url, body, response.status_code,
+                                 dict(response.headers), content, time.monotonic() - start)
+            return response
+
+        status, headers, content = self.cassette.play(request.method, request.url, body)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.reason = ""
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class _HttpxCassetteMixin:
+    """httpx 传输层的录制 / 回放逻辑"""
+
+    cassette: Cassette
+
+    def _replay(self, request: httpx.Request) -> httpx.Response:
+        status, headers, content = self.cassette.play(request.method, str(request.url), request.content)
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+    def _record(self, request: httpx.Request, response: httpx.Response, content: bytes, elapsed: float):
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        self.cassette.record(request.method, str(request.url), request.content, response.status_code,
+                             headers, content, elapsed)
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+
+class CassetteTransport(_HttpxCassetteMixin, httpx.BaseTransport):
+    """httpx 同步传输层（供 ChatOpenAI 使用）"""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self._transport = httpx.HTTPTransport() if cassette.recording else None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.cassette.recording:
+            return self._replay(request)
+        start = time.monotonic()
+        response = self._transport.handle_request(request)
+        content = response.read()
+        return self._record(request, response, content, time.monotonic() - start)
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+
+class AsyncCassetteTransport(_HttpxCassetteMixin, httpx.AsyncBaseTransport):
+    """httpx 异步传输层（供 ChatOpenAI 使用）"""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self._transport = httpx.AsyncHTTPTransport() if cassette.recording else None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.cassette.recording:
+            return self._replay(request)
+        start = time.monotonic()
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        return self._record(request, response, content, time.monotonic() - start)
+
+    async def aclose(self):
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+_shared_cassettes: Dict[str, Cassette] = {}
+_shared_lock = threading.Lock()
+
+
+def get_cassette(settings: Settings) -> Optional[Cassette]:
+    """获取进程内共享的录制文件，未启用时返回 None"""
+    if settings.cassette_mode not in Cassette.MODES:
+        return None
+    with _shared_lock:
+        if settings.cassette_path not in _shared_cassettes:
+            _shared_cassettes[settings.cassette_path] = Cassette(
+                settings.cassette_path, settings.cassette_mode, settings.replay_latency
+            )
+        return _shared_cassettes[settings.cassette_path]
+
+
+def httpx_clients(settings: Settings) -> Dict[str, Any]:
+    """返回传给 ChatOpenAI 的 http_client / http_async_client 参数"""
+    cassette = get_cassette(settings)
+    if cassette is None:
+        return {}
+    return {
+        "http_client": httpx.Client(transport=CassetteTransport(cassette), timeout=120),
+        "http_async_client": httpx.AsyncClient(transport=AsyncCassetteTransport(cassette), timeout=120),
+    }
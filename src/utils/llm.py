@@ -0,0 +1,135 @@
+"""LLM 客户端工厂和请求限流"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple, Union
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_openai import ChatOpenAI
+from config.settings import Settings
+from utils.cassette import httpx_clients
+
+
+def create_chat_model(settings: Settings, temperature: float) -> ChatOpenAI:
+    """按配置创建 ChatOpenAI，启用录制 / 回放时接入对应的 HTTP 客户端"""
+    return ChatOpenAI(
+        model_name=settings.llm_model_name,
+        temperature=temperature,
+        openai_api_key=settings.openai_api_key,
+        openai_api_base=settings.openai_api_base,
+        **httpx_clients(settings)
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 字 1 token，其余约 4 字符 1 token"""
+    wide = sum(1 for ch in text if ord(ch) > 0x2E80)
+    return wide + (len(text) - wide) // 4 + 1
+
+
+class LLMRateLimiter:
+    """按服务商的每分钟请求数（RPM）和每分钟 token 数（TPM）限流
+
+    记录最近 60 秒内发出的请求及其估算 token 数，任一额度不足时阻塞等待
+    最早的记录滑出窗口。限额为 0 表示不限制。
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._tokens = 0
+        self._announced_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int):
+        """登记一次请求，必要时阻塞等待"""
+        if self.tpm > 0:
+            # 单个请求超过整分钟额度时只能独占一个窗口
+            tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._events and now - self._events[0][0] >= self.WINDOW:
+                    self._tokens -= self._events.popleft()[1]
+                rpm_ok = self.rpm <= 0 or len(self._events) < self.rpm
+                tpm_ok = self.tpm <= 0 or self._tokens + tokens <= self.tpm
+                if rpm_ok and tpm_ok:
+                    self._events.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                wait = self._events[0][0] + self.WINDOW - now
+                # 多个线程同时等待时只提示一次
+                if now - self._announced_at >= self.WINDOW:
+                    self._announced_at = now
+                    print(f"   ⏳ LLM 请求达到每分钟限额，等待 {wait:.0f}s...")
+            time.sleep(max(wait, 0.05))
+
+
+_shared_models: Dict[tuple, ChatOpenAI] = {}
+_shared_limiters: Dict[tuple, LLMRateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_chat_model(settings: Settings, temperature: float) -> ChatOpenAI:
+    """获取进程内共享的 ChatOpenAI（复用底层连接池）"""
+    key = (settings.openai_api_base, settings.llm_model_name, temperature)
+    with _shared_lock:
+        if key not in _shared_models:
+            _shared_models[key] = create_chat_model(settings, temperature)
+        return _shared_models[key]
+
+
+def get_llm_limiter(settings: Settings) -> LLMRateLimiter:
+    """获取进程内共享的限流器（同一服务地址和模型共用额度）"""
+    key = (settings.openai_api_base, settings.llm_model_name)
+    with _shared_lock:
+        if key not in _shared_limiters:
+            _shared_limiters[key] = LLMRateLimiter(settings.llm_rpm, settings.llm_tpm)
+        return _shared_limiters[key]
+
+
+class ThrottledChatModel(Runnable):
+    """发送请求时先向限流器申请额度的模型包装
+
+    额度在真正发出请求的 invoke / stream 中申请。若把限流写成链中单独的一步，
+    RunnableSequence.batch 会先对所有输入执行完这一步再统一发送，许可全部取完后
+    请求仍会同时发出。
+    """
+
+    def __init__(
+        self,
+        model: Runnable,
+        limiter: LLMRateLimiter,
+        max_output_tokens: Union[int, Callable[[str], int]] = 500
+    ):
+        self.model = model
+        self.limiter = limiter
+        self.max_output_tokens = max_output_tokens
+
+    def _acquire(self, prompt: Any):
+        text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+        reserve = self.max_output_tokens(text) if callable(self.max_output_tokens) else self.max_output_tokens
+        self.limiter.acquire(estimate_tokens(text) + reserve)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        self._acquire(input)
+        return self.model.invoke(input, config, **kwargs)
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        self._acquire(input)
+        yield from self.model.stream(input, config, **kwargs)
+
+
+def throttled_chat_model(
+    settings: Settings,
+    temperature: float,
+    max_output_tokens: Union[int, Callable[[str], int]] = 500
+) -> Runnable:
+    """返回发送前先按估算 token 数限流的共享模型，可直接接在提示模板之后
+
+    max_output_tokens 为预留给输出的 token 数；输出长度随提示词内容变化时（如批量总结），
+    可传入函数按提示词文本计算每次请求的预留。
+    """
+    return ThrottledChatModel(get_chat_model(settings, temperature), get_llm_limiter(settings), max_output_tokens)
@@ -0,0 +1,20 @@
+"""测试公共配置：把 src 加入导入路径，提供不触网的最小配置"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config.settings import Settings  # noqa: E402
+
+
+@pytest.fixture
+def settings(tmp_path) -> Settings:
+    """所有缓存写到临时目录"""
+    return Settings(
+        github_token="test-token",
+        github_username="tester",
+        openai_api_key="test-key",
+        cache_dir=str(tmp_path / "cache"),
+    )
@@ -0,0 +1,173 @@
+"""AIAnalyzer 分片和变化报告相关的单元测试"""
+import time
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from analyzers.ai_analyzer import AIAnalyzer
+
+
+def make_df(rows) -> pd.DataFrame:
+    """rows: [(仓库名, 编程语言, 沉寂天数, 仓库状态)]"""
+    return pd.DataFrame([
+        {"仓库名": name, "编程语言": language, "Star数": i, "沉寂天数": days, "仓库状态": status,
+         "项目标签": "", "项目描述": f"desc {name}"}
+        for i, (name, language, days, status) in enumerate(rows)
+    ])
+
+
+def shard_names(shards):
+    return [line.split()[1] for _, lines in shards for line in lines]
+
+
+@pytest.fixture
+def analyzer(settings) -> AIAnalyzer:
+    return AIAnalyzer(settings)
+
+
+def test_shard_covers_every_row_once(analyzer):
+    df = make_df([
+        ("a/active", "Go", 10, "正常"),
+        ("a/half", "Go", 200, "正常"),
+        ("a/dead", None, 800, "正常"),
+        ("a/archived", "Rust", 5, "已归档"),
+        ("a/unknown", "Go", -1, "正常"),
+        ("a/unknown-archived", "Go", -1, "已禁用"),
+    ])
+
+    shards = analyzer._shard(df)
+    names = shard_names(shards)
+
+    assert sorted(names) == sorted(df["仓库名"])
+    buckets = {line.split()[1]: name.split(" / ")[0] for name, lines in shards for line in lines}
+    assert buckets["a/unknown"] == "未知活跃度"
+    assert buckets["a/unknown-archived"] == "已归档/禁用"
+    assert buckets["a/archived"] == "已归档/禁用"
+    assert buckets["a/dead"] == "长期沉寂"
+
+
+def test_shard_splits_by_token_budget(analyzer):
+    analyzer.settings = replace(analyzer.settings, analysis_shard_tokens=200)
+    df = make_df([(f"o/r{i}", "Go", 10, "正常") for i in range(40)])
+
+    shards = analyzer._shard(df)
+
+    assert len(shards) > 1
+    assert all(name.startswith("近期活跃 / Go (") for name, _ in shards)
+    assert sorted(shard_names(shards)) == sorted(df["仓库名"])
+
+
+def test_shard_packs_small_languages_together(analyzer):
+    analyzer.settings = replace(analyzer.settings, analysis_shard_tokens=400)
+    rows = [(f"o/{lang}{i}", lang, 10, "正常") for lang in ("C", "Go", "Lua", "Nim", "Zig") for i in range(2)]
+    rows += [(f"o/big{i}", "Rust", 10, "正常") for i in range(40)]
+    df = make_df(rows)
+
+    shards = analyzer._shard(df)
+
+    small = [name for name, _ in shards if "Rust" not in name]
+    assert small == ["近期活跃 / C、Go、Lua 等 5 种语言"]
+    assert all(name.startswith("近期活跃 / Rust (") for name, _ in shards if name not in small)
+    assert sorted(shard_names(shards)) == sorted(df["仓库名"])
+
+
+FINGERPRINTS = {"overview": "o1", "archived": "a1", "half_yr": "h1", "dead": "d1"}
+
+
+def make_memo(base_fingerprints, last_fingerprints=None, age_days: float = 0):
+    base = {"fingerprints": base_fingerprints, "inputs": {}, "report": "BASE", "at": "T0",
+            "ts": time.time() - age_days * 86400}
+    last = {"fingerprints": last_fingerprints or base_fingerprints, "inputs": {}, "report": "LAST", "at": "T1"}
+    return {"base": base, "last": last}
+
+
+def test_delta_applicable_with_few_changes(analyzer):
+    current = {**FINGERPRINTS, "dead": "d2"}
+
+    assert analyzer._delta_applicable(make_memo(FINGERPRINTS), current)
+
+
+def test_delta_not_applicable_when_most_buckets_changed(analyzer):
+    current = {**FINGERPRINTS, "archived": "a2", "half_yr": "h2", "dead": "d2"}
+
+    assert not analyzer._delta_applicable(make_memo(FINGERPRINTS), current)
+
+
+def test_delta_not_applicable_when_base_is_stale(analyzer):
+    analyzer.settings = replace(analyzer.settings, report_refresh_days=7)
+    current = {**FINGERPRINTS, "dead": "d2"}
+
+    assert not analyzer._delta_applicable(make_memo(FINGERPRINTS, age_days=8), current)
+
+
+def test_delta_drift_is_measured_against_base(analyzer):
+    # 与上次运行相比只变了一组，但相对完整报告已漂移过半
+    current = {**FINGERPRINTS, "archived": "a2", "half_yr": "h2", "dead": "d3"}
+    last = {**FINGERPRINTS, "archived": "a2", "half_yr": "h2", "dead": "d2"}
+
+    assert not analyzer._delta_applicable(make_memo(FINGERPRINTS, last), current)
+
+
+class FailingChain:
+    def __init__(self, chunks_before_error):
+        self.chunks_before_error = chunks_before_error
+
+    def stream(self, _inputs):
+        yield from self.chunks_before_error
+        raise RuntimeError("boom")
+
+
+def delta_context(analyzer):
+    context = {f"{key}_str": "" for key in analyzer.BUCKET_TITLES}
+    context.update(total_count=1, archived_count=0, disabled_count=0,
+                   active_recent=1, inactive_half_yr=0, inactive_1yr=0)
+    context["fingerprints"] = {**FINGERPRINTS, "dead": "d2"}
+    return context
+
+
+def test_stream_delta_reports_early_failure_without_output(analyzer):
+    analyzer._delta_chain = FailingChain([])
+    errors = []
+
+    output = list(analyzer._stream_delta("scope", make_memo(FINGERPRINTS), delta_context(analyzer), errors))
+
+    assert output == []
+    assert errors == ["boom"]
+
+
+def test_stream_delta_keeps_base_report_after_midstream_failure(analyzer):
+    analyzer._delta_chain = FailingChain(["部分变化"])
+    errors = []
+
+    report = "".join(analyzer._stream_delta("scope", make_memo(FINGERPRINTS), delta_context(analyzer), errors))
+
+    assert errors == []
+    assert "部分变化" in report
+    assert "变化报告生成中断" in report
+    assert report.endswith("BASE")
+
+
+class RecordingChain:
+    def __init__(self):
+        self.items = []
+
+    def stream(self, item):
+        self.items.append(item)
+        yield item["title"]
+
+
+def test_sections_only_get_their_bucket_summaries(analyzer):
+    analyzer._section_chain = RecordingChain()
+    context = delta_context(analyzer)
+    context["bucket_summaries"] = {"已归档/禁用": "ARCHIVED", "近期活跃": "ACTIVE", "长期沉寂": "DEAD"}
+    context["extra_context"] = "ALL"
+
+    list(analyzer._stream_sections(context, []))
+
+    extra = {item["title"][0]: item["extra_context"] for item in analyzer._section_chain.items}
+    assert extra["1"] == "ALL"
+    assert "ARCHIVED" in extra["2"] and "ACTIVE" not in extra["2"]
+    assert "ACTIVE" in extra["3"] and "DEAD" not in extra["3"]
+    assert "DEAD" in extra["5"] and "ARCHIVED" not in extra["5"]
+    assert extra["4"] == extra["6"] == extra["7"] == ""
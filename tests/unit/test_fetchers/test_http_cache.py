@@ -0,0 +1,86 @@
+"""HttpCache 单元测试"""
+import os
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from fetchers import http_cache
+from fetchers.http_cache import HttpCache
+
+
+class FakeClock:
+    """每次调用前进 1 秒，保证访问时间严格递增"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        self.now += 1
+        return self.now
+
+
+def make_response(body: bytes, etag: str = '"v1"', status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict({"ETag": etag, "Content-Type": "application/json"})
+    response._content = body
+    return response
+
+
+def test_lru_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "time", FakeClock())
+    # 随机数据几乎不可压缩，每条约 1000 字节
+    cache = HttpCache(str(tmp_path / "http.sqlite3"), max_bytes=2500)
+    cache.store("a", make_response(os.urandom(1000)))
+    cache.store("b", make_response(os.urandom(1000)))
+    assert cache.load("a", "https://example.com/a") is not None
+
+    cache.store("c", make_response(os.urandom(1000)))
+
+    assert cache.load("b", "https://example.com/b") is None
+    assert cache.load("a", "https://example.com/a") is not None
+    assert cache.load("c", "https://example.com/c") is not None
+    assert cache._total_bytes <= 2500
+
+
+def test_total_bytes_survives_reopen(tmp_path):
+    path = str(tmp_path / "http.sqlite3")
+    cache = HttpCache(path, max_bytes=10 ** 6)
+    cache.store("a", make_response(os.urandom(500)))
+    cache.store("a", make_response(os.urandom(800)))
+
+    assert HttpCache(path, max_bytes=10 ** 6)._total_bytes == cache._total_bytes
+
+
+def test_store_skips_responses_without_validators(tmp_path):
+    cache = HttpCache(str(tmp_path / "http.sqlite3"), max_bytes=10 ** 6)
+    response = make_response(b"{}")
+    del response.headers["ETag"]
+    cache.store("a", response)
+    cache.store("b", make_response(b"{}", status=404))
+
+    assert cache.load("a", "https://example.com/a") is None
+    assert cache.load("b", "https://example.com/b") is None
+
+
+def test_load_restores_body_and_conditional_headers(tmp_path):
+    cache = HttpCache(str(tmp_path / "http.sqlite3"), max_bytes=10 ** 6)
+    cache.store("a", make_response(b'{"ok": true}', etag='"abc"'))
+
+    loaded = cache.load("a", "https://example.com/a")
+    assert loaded.status_code == 200
+    assert loaded.json() == {"ok": True}
+    assert loaded.from_cache
+    assert cache.conditional_headers("a") == {"If-None-Match": '"abc"'}
+    assert cache.conditional_headers("missing") == {}
+
+
+def test_make_key_shares_entries_across_tokens():
+    url = "https://api.github.com/repos/a/b/readme"
+    first = HttpCache.make_key(url, {"Authorization": "token one"})
+    second = HttpCache.make_key(url, {"Authorization": "token two"})
+    raw = HttpCache.make_key(url, {"Authorization": "token one", "Accept": "application/vnd.github.raw"})
+
+    assert first == second == HttpCache.make_key(url)
+    assert raw != first
+    assert "token" not in first
@@ -0,0 +1,62 @@
+"""RateLimitScheduler 单元测试"""
+import time
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from fetchers.rate_limiter import RateLimitScheduler
+
+
+def rate_response(remaining: int, reset_in: float, limit: int = 5000, resource: str = "core") -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict({
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time() + reset_in)),
+        "X-RateLimit-Resource": resource,
+    })
+    return response
+
+
+def test_plenty_of_quota_runs_at_full_speed():
+    scheduler = RateLimitScheduler(burst=2)
+    scheduler.update(rate_response(remaining=4000, reset_in=3600))
+
+    start = time.monotonic()
+    for _ in range(200):
+        scheduler.acquire()
+
+    assert time.monotonic() - start < 0.5
+    assert scheduler.headroom()[0] == 3800
+
+
+def test_paces_below_low_water_reserve():
+    scheduler = RateLimitScheduler(burst=1)
+    # 剩余 20 个、10 秒后重置：低于 10% 水位，按 2 个/秒限速
+    scheduler.update(rate_response(remaining=20, reset_in=10, limit=5000))
+
+    start = time.monotonic()
+    for _ in range(3):
+        scheduler.acquire()
+
+    assert time.monotonic() - start == pytest.approx(1.0, abs=0.3)
+
+
+def test_stale_response_in_same_window_does_not_raise_remaining():
+    scheduler = RateLimitScheduler()
+    scheduler.update(rate_response(remaining=100, reset_in=600))
+    scheduler.update(rate_response(remaining=150, reset_in=600))
+
+    assert scheduler.headroom()[0] == 100
+
+
+def test_resources_are_tracked_separately():
+    scheduler = RateLimitScheduler()
+    scheduler.update(rate_response(remaining=0, reset_in=600, resource="graphql"))
+
+    assert scheduler.headroom("graphql")[0] == 0
+    assert scheduler.headroom("core")[0] is None
+    assert RateLimitScheduler.resource_for("https://api.github.com/graphql") == "graphql"
+    assert RateLimitScheduler.resource_for("https://api.github.com/search/repositories") == "search"
@@ -0,0 +1,43 @@
+"""ReadmeExtractor 批量总结相关的单元测试"""
+from dataclasses import replace
+
+from fetchers.readme_extractor import ReadmeExtractor
+
+
+def test_parse_json_object_tolerates_wrapping():
+    output = '好的，结果如下：\n```json\n{"a/b": "一个工具", "c/d": "一个库"}\n```'
+
+    assert ReadmeExtractor._parse_json_object(output) == {"a/b": "一个工具", "c/d": "一个库"}
+
+
+def test_parse_json_object_rejects_invalid_output():
+    assert ReadmeExtractor._parse_json_object("没有 JSON") == {}
+    assert ReadmeExtractor._parse_json_object('{"a/b": ') == {}
+    assert ReadmeExtractor._parse_json_object("}{") == {}
+
+
+def test_pack_batches_respects_item_limit(settings):
+    extractor = ReadmeExtractor(replace(settings, summary_batch_size=2, summary_batch_tokens=10 ** 6))
+    texts = {f"o/r{i}": "short readme" for i in range(5)}
+
+    batches = extractor._pack_batches(texts)
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [name for batch in batches for name in batch] == list(texts)
+
+
+def test_pack_batches_respects_token_budget(settings):
+    extractor = ReadmeExtractor(replace(settings, summary_batch_size=20, summary_batch_tokens=100))
+    texts = {"o/big": "word " * 400, "o/a": "small", "o/b": "small"}
+
+    batches = extractor._pack_batches(texts)
+
+    # 超出预算的单个条目独占一批，不会被丢弃
+    assert batches == [{"o/big": texts["o/big"]}, {"o/a": "small", "o/b": "small"}]
+
+
+def test_batch_output_tokens_scale_with_batch_size():
+    prompt = "\n\n".join(f"{ReadmeExtractor.BATCH_ITEM_MARKER}o/r{i}\ntext" for i in range(3))
+
+    assert ReadmeExtractor._batch_output_tokens(prompt) == 3 * ReadmeExtractor.BATCH_ITEM_OUTPUT_TOKENS
+    assert ReadmeExtractor._batch_output_tokens("") == ReadmeExtractor.BATCH_ITEM_OUTPUT_TOKENS
@@ -0,0 +1,45 @@
+"""StarredRepoFetcher 单元测试"""
+from datetime import datetime, timezone
+
+from fetchers.starred_repos import StarredRepoFetcher
+from models.repository import Repository
+from storage.star_state import StarState
+
+NOW = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def repo(name: str) -> Repository:
+    return Repository(
+        full_name=name,
+        description=None,
+        html_url=f"https://github.com/{name}",
+        language=None,
+        stargazers_count=0,
+        pushed_at=None,
+    )
+
+
+def test_reconcile_tombstones_removed_repos():
+    state = StarState(repos=[repo("a/a"), repo("b/b")])
+
+    StarredRepoFetcher._reconcile(state, [repo("b/b"), repo("c/c")], NOW)
+
+    assert [r.full_name for r in state.repos] == ["b/b", "c/c"]
+    assert state.tombstones == {"a/a": "2026-01-02T03:04:05Z"}
+
+
+def test_reconcile_clears_tombstones_of_restarred_repos():
+    state = StarState(repos=[repo("b/b")], tombstones={"a/a": "2025-12-01T00:00:00Z"})
+
+    StarredRepoFetcher._reconcile(state, [repo("a/a"), repo("b/b")], NOW)
+
+    assert state.tombstones == {}
+    assert [r.full_name for r in state.repos] == ["a/a", "b/b"]
+
+
+def test_reconcile_keeps_older_tombstones():
+    state = StarState(repos=[repo("b/b")], tombstones={"a/a": "2025-12-01T00:00:00Z"})
+
+    StarredRepoFetcher._reconcile(state, [repo("b/b")], NOW)
+
+    assert state.tombstones == {"a/a": "2025-12-01T00:00:00Z"}
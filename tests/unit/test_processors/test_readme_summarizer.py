@@ -0,0 +1,89 @@
+"""ReadmeSummarizer 单元测试"""
+from processors.readme_summarizer import ReadmeSummarizer
+
+CLEAR_README = """# fastcsv
+
+[![build](https://img.shields.io/badge/build-passing-green.svg)](https://example.com)
+
+fastcsv is a small library for parsing CSV files quickly in Rust.
+
+## Install
+
+```bash
+cargo add fastcsv
+```
+"""
+
+VAGUE_README = """# tool
+
+## Table of Contents
+
+- [Install](#install)
+
+## Install
+
+```bash
+pip install tool
+```
+
+## Usage
+
+Run tool with the options below.
+"""
+
+
+def test_summarize_picks_tagline_with_high_confidence():
+    summary, confidence = ReadmeSummarizer().summarize(CLEAR_README)
+
+    assert summary == "fastcsv is a small library for parsing CSV files quickly in Rust."
+    assert confidence >= 0.7
+
+
+def test_summarize_gives_up_on_readme_without_intro():
+    assert ReadmeSummarizer().summarize(VAGUE_README) == ("", 0.0)
+
+
+def test_summarize_empty_readme():
+    assert ReadmeSummarizer().summarize("") == ("", 0.0)
+
+
+def test_summarize_chinese_intro():
+    summary, confidence = ReadmeSummarizer().summarize("# 工具\n\n一个用于批量重命名文件的命令行工具，支持正则表达式。\n")
+
+    assert summary == "一个用于批量重命名文件的命令行工具，支持正则表达式。"
+    assert confidence > 0
+
+
+def test_noise_keywords_match_whole_words_only():
+    summary, _ = ReadmeSummarizer().summarize("# toot\n\nA Mastodon client for the terminal.\n")
+
+    assert summary == "A Mastodon client for the terminal."
+    assert ReadmeSummarizer.NOISE.search("TODO: write docs")
+    assert ReadmeSummarizer.NOISE.search("English | 中文")
+
+
+def test_summary_length_is_capped():
+    readme = "# big\n\nbig is a tool that " + "does many things and " * 30 + "more.\n"
+    summary, _ = ReadmeSummarizer().summarize(readme)
+
+    assert 0 < len(summary) <= ReadmeSummarizer.MAX_SUMMARY_CHARS
+
+
+def test_deprecation_notice_is_not_confident():
+    summarizer = ReadmeSummarizer()
+
+    for notice in ("Warning This project is no longer maintained.",
+                   "DEPRECATED: this library is deprecated, use something else instead."):
+        _, confidence = summarizer.summarize(f"# old\n\n{notice}\n")
+        assert confidence < 0.7
+
+
+def test_callouts_are_skipped_before_lead_paragraph():
+    for callout in ("> [!WARNING]\n> This project is looking for maintainers.",
+                    "> [!NOTE]\n> Version 2 changes the config format.",
+                    "> **Warning**\n> Breaking changes ahead."):
+        readme = f"# fastcsv\n\n{callout}\n\nfastcsv is a small library for parsing CSV files quickly in Rust.\n"
+        summary, confidence = ReadmeSummarizer().summarize(readme)
+
+        assert summary == "fastcsv is a small library for parsing CSV files quickly in Rust."
+        assert confidence >= 0.7
@@ -0,0 +1,73 @@
+"""LLM 限流相关的单元测试"""
+import threading
+import time
+
+import pytest
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from utils.llm import LLMRateLimiter, ThrottledChatModel, estimate_tokens
+
+
+class RecordingModel:
+    """记录每次发送的时间，代替真实模型"""
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, prompt):
+        with self._lock:
+            self.sent.append(time.monotonic())
+        return f"reply to {prompt.to_string()}"
+
+
+def test_batch_sends_are_spread_by_rpm():
+    limiter = LLMRateLimiter(rpm=3)
+    limiter.WINDOW = 0.5
+    model = RecordingModel()
+    chain = PromptTemplate.from_template("{x}") | ThrottledChatModel(RunnableLambda(model.send), limiter, 10)
+
+    start = time.monotonic()
+    outputs = chain.batch([{"x": i} for i in range(7)], config={"max_concurrency": 7})
+
+    assert outputs == [f"reply to {i}" for i in range(7)]
+    sent = sorted(t - start for t in model.sent)
+    # 每个窗口最多 3 次：0-2 立即发送，3-5 等一个窗口，6 等两个窗口
+    assert max(sent[:3]) < 0.3
+    assert min(sent[3:6]) >= 0.45
+    assert sent[6] >= 0.95
+
+
+def test_stream_acquires_before_sending():
+    limiter = LLMRateLimiter(rpm=1)
+    limiter.WINDOW = 0.4
+    model = RecordingModel()
+    throttled = ThrottledChatModel(RunnableLambda(model.send), limiter, 10)
+    prompt = PromptTemplate.from_template("{x}")
+
+    start = time.monotonic()
+    for i in range(2):
+        assert "".join(throttled.stream(prompt.invoke({"x": i}))) == f"reply to {i}"
+
+    assert model.sent[1] - start >= 0.35
+
+
+def test_reservation_includes_output_budget():
+    limiter = LLMRateLimiter(tpm=10 ** 6)
+    prompt = PromptTemplate.from_template("{x}").invoke({"x": "### 仓库: a\n### 仓库: b"})
+    throttled = ThrottledChatModel(RunnableLambda(lambda p: ""), limiter,
+                                   lambda text: 100 * text.count("### 仓库: "))
+
+    throttled.invoke(prompt)
+
+    assert limiter._tokens == estimate_tokens(prompt.to_string()) + 200
+
+
+@pytest.mark.parametrize("tokens", [0, 50])
+def test_tpm_disabled_or_roomy_does_not_block(tokens):
+    limiter = LLMRateLimiter(rpm=0, tpm=0)
+    start = time.monotonic()
+    for _ in range(20):
+        limiter.acquire(tokens)
+    assert time.monotonic() - start < 0.1